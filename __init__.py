@@ -1,10 +1,85 @@
-import busio
-import board
+import time
+
+try:
+    from _thread import _local as _thread_local
+except ImportError:
+    # no threads (CircuitPython): a plain object does
+    class _thread_local:
+        pass
 
 # Define the device name and I2C addresses
 _DEFAULT_NAME = "Qwiic Serial Control Motor Driver"
 _AVAILABLE_I2C_ADDRESS = [0x5D, 0x58, 0x59, 0x5A, 0x5C]
 
+# bus scans shared by every QwiicScmd: bus -> (time.monotonic() of scan, addresses);
+# keyed on the bus behind any wrappers (bus_proxy.BusProxy.wrapped_bus)
+_scan_cache = {}
+
+def _build_drive_table(direction):
+    # 8 bit level (0 to 255) -> drive byte, 0x80 is stopped
+    table = bytearray(256)
+    for level in range(256):
+        half = (level + 1 - direction) // 2
+        table[level] = 128 + half if direction else 128 - half
+    return table
+
+# indexed [direction][level]
+_DRIVE_TABLE = (_build_drive_table(0), _build_drive_table(1))
+
+def _drive_byte(direction, level):
+    # drive byte for a direction (0 or 1) and level (0 to 255); a float level
+    # is truncated. Checked here so a negative level never indexes the table
+    # from its end.
+    level = int(level)
+    if direction not in (0, 1) or not 0 <= level <= 255:
+        raise ValueError("direction must be 0 or 1 and level 0 to 255")
+    return _DRIVE_TABLE[1 if direction else 0][level]
+
+def _write_packed(i2c, address, buffer, values):
+    # values: dict of register: value. Written in ascending register order,
+    # each run of consecutive registers (up to len(buffer) - 1 of them) as
+    # one auto-incrementing write from buffer. Returns the number of writes.
+    writes = 0
+    count = 0
+    for register in sorted(values):
+        if count and (buffer[0] + count != register or count == len(buffer) - 1):
+            i2c.writeto(address, buffer, end=count + 1)
+            writes += 1
+            count = 0
+        if not count:
+            buffer[0] = register
+        count += 1
+        buffer[count] = values[register]
+    if count:
+        i2c.writeto(address, buffer, end=count + 1)
+        writes += 1
+    return writes
+
+class _Unheld:
+    # context manager that does nothing, for buses without hold()
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+_UNHELD = _Unheld()
+
+class _Session:
+    # context manager returned by QwiicScmd.session(); it carries its own
+    # timeout, so threads opening sessions on one driver do not share one
+    def __init__(self, motor, timeout):
+        self._motor = motor
+        self._timeout = timeout
+
+    def __enter__(self):
+        self._motor._lock(self._timeout)
+        return self._motor
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._motor._unlock()
+        return False
+
 class SCMDDiagnostics:
     def __init__(self):
         self.numberOfSlaves = 0
@@ -25,155 +100,886 @@ class QwiicScmd:
     device_name = _DEFAULT_NAME
     available_addresses = _AVAILABLE_I2C_ADDRESS
 
-    def __init__(self, address=None, i2c_driver=None):
+    # seconds to wait for the I2C bus lock before giving up
+    lock_timeout = 1.0
+    # if set, is_connected() answers from a bus scan up to this many seconds old
+    scan_cache_ttl = None
+    # longest sleep between try_lock() attempts while waiting
+    _LOCK_MAX_BACKOFF = 0.005
+    # seconds to wait for a remote (expansion slave) read to complete
+    remote_timeout = 0.1
+    # status polling: first sleep, longest sleep kept under the lock, longest sleep
+    _POLL_MIN = 0.0002
+    _POLL_HOLD_MAX = 0.001
+    _POLL_MAX = 0.02
+
+    # Registers
+    SCMD_FID = 0x00
+    SCMD_ID = 0x01
+    SCMD_SLAVE_ADDR = 0x02
+    SCMD_CONFIG_BITS = 0x03
+    SCMD_U_I2C_RD_ERR = 0x04
+    SCMD_U_I2C_WR_ERR = 0x05
+    SCMD_U_BUF_DUMPED = 0x06
+    SCMD_E_I2C_RD_ERR = 0x07
+    SCMD_E_I2C_WR_ERR = 0x08
+    SCMD_LOOP_TIME = 0x09
+    SCMD_SLV_POLL_CNT = 0x0A
+    SCMD_SLV_TOP_ADDR = 0x0B
+    SCMD_MST_E_ERR = 0x0C
+    SCMD_MST_E_STATUS = 0x0D
+    SCMD_FSAFE_FAULTS = 0x0E
+    SCMD_REG_OOR_CNT = 0x0F
+    SCMD_REG_RO_WRITE_CNT = 0x10
+    SCMD_GEN_TEST_WORD = 0x11
+    SCMD_MOTOR_A_INVERT = 0x12
+    SCMD_MOTOR_B_INVERT = 0x13
+    SCMD_BRIDGE = 0x14
+    SCMD_LOCAL_MASTER_LOCK = 0x15
+    SCMD_LOCAL_USER_LOCK = 0x16
+    SCMD_MST_E_IN_FN = 0x17
+    SCMD_U_PORT_CLKDIV_U = 0x18
+    SCMD_U_PORT_CLKDIV_L = 0x19
+    SCMD_U_PORT_CLKDIV_CTRL = 0x1A
+    SCMD_E_PORT_CLKDIV_U = 0x1B
+    SCMD_E_PORT_CLKDIV_L = 0x1C
+    SCMD_E_PORT_CLKDIV_CTRL = 0x1D
+    SCMD_U_BUS_UART_BAUD = 0x1E
+    SCMD_FSAFE_CTRL = 0x1F
+    SCMD_MA_DRIVE = 0x20
+    SCMD_MB_DRIVE = 0x21
+    SCMD_INV_2_9 = 0x50
+    SCMD_INV_10_17 = 0x51
+    SCMD_INV_18_25 = 0x52
+    SCMD_INV_26_33 = 0x53
+    SCMD_BRIDGE_SLV_L = 0x54
+    SCMD_BRIDGE_SLV_H = 0x55
+    SCMD_PAGE_SELECT = 0x6F
+    SCMD_DRIVER_ENABLE = 0x70
+    SCMD_UPDATE_RATE = 0x71
+    SCMD_FORCE_UPDATE = 0x72
+    SCMD_E_BUS_SPEED = 0x73
+    SCMD_MASTER_LOCK = 0x74
+    SCMD_USER_LOCK = 0x75
+    SCMD_FSAFE_TIME = 0x76
+    SCMD_STATUS_1 = 0x77
+    SCMD_CONTROL_1 = 0x78
+    SCMD_REM_ADDR = 0x79
+    SCMD_REM_OFFSET = 0x7A
+    SCMD_REM_DATA_WR = 0x7B
+    SCMD_REM_DATA_RD = 0x7C
+    SCMD_REM_WRITE = 0x7D
+    SCMD_REM_READ = 0x7E
+
+    ID_WORD = 0xA9
+    START_SLAVE_ADDR = 0x50
+    MAX_SLAVE_ADDR = 0x5F
+
+    # Status bits
+    SCMD_ENUMERATION_BIT = 0x01
+    SCMD_BUSY_BIT = 0x02
+    SCMD_REM_READ_BIT = 0x04
+    SCMD_REM_WRITE_BIT = 0x08
+    SCMD_HW_EN_BIT = 0x10
+
+    # Fail-safe control values
+    SCMD_FSAFE_DRIVE_KILL = 0x01
+    SCMD_FSAFE_RESTART_MASK = 0x06
+    SCMD_FSAFE_REBOOT = 0x02
+    SCMD_FSAFE_RE_ENUM = 0x04
+    SCMD_FSAFE_CYCLE_USER = 0x08
+    SCMD_FSAFE_CYCLE_EXP = 0x10
+
+    # Configuration registers kept in the shadow, as (first, count) blocks
+    _SHADOW_BLOCKS = (
+        (SCMD_MOTOR_A_INVERT, SCMD_BRIDGE - SCMD_MOTOR_A_INVERT + 1),
+        (SCMD_INV_2_9, SCMD_BRIDGE_SLV_H - SCMD_INV_2_9 + 1),
+        (SCMD_PAGE_SELECT, SCMD_DRIVER_ENABLE - SCMD_PAGE_SELECT + 1),
+    )
+
+    # Counters an expansion slave keeps, as (SCMDDiagnostics field, register)
+    _REMOTE_DIAG = (
+        ("E_I2C_RD_ERR", SCMD_E_I2C_RD_ERR),
+        ("E_I2C_WR_ERR", SCMD_E_I2C_WR_ERR),
+        ("LOOP_TIME", SCMD_LOOP_TIME),
+        ("FSAFE_FAULTS", SCMD_FSAFE_FAULTS),
+        ("REG_OOR_CNT", SCMD_REG_OOR_CNT),
+        ("REG_RO_WRITE_CNT", SCMD_REG_RO_WRITE_CNT),
+    )
+
+    # Diagnostic counters are contiguous from U_I2C_RD_ERR to REG_RO_WRITE_CNT
+    _DIAG_FIRST = SCMD_U_I2C_RD_ERR
+    _DIAG_LENGTH = SCMD_REG_RO_WRITE_CNT - SCMD_U_I2C_RD_ERR + 1
+
+    # __init__( ... )
+    #
+    #   suppress_redundant_writes -- skip drive/config writes that would not
+    #       change the register (opt-in)
+    #   refresh_interval -- seconds after which an unchanged register is
+    #       written again anyway, which keeps the fail-safe timer fed
+    #   frequency -- I2C clock in Hz for the bus created when no i2c_driver
+    #       is given, e.g. 400000; None keeps the busio default
+    #   scl, sda -- pins for that bus, default board.SCL and board.SDA
+    #   shadow_config -- trust the configuration/page shadow; False reads
+    #       before every read-modify-write and selects the page on every
+    #       paged access. None: off for buses other processes write too
+    #       (i2c_driver.shared, e.g. broker.BrokerI2C), on otherwise
+    def __init__(self, address=None, i2c_driver=None, suppress_redundant_writes=False,
+                 refresh_interval=0.1, frequency=None, scl=None, sda=None, shadow_config=None):
         self.address = address if address is not None else self.available_addresses[0]
         if i2c_driver is None:
-            self.i2c = busio.I2C(board.SCL, board.SDA)
+            # imported here so hosts that inject a driver need neither
+            import board
+            import busio
+            scl = board.SCL if scl is None else scl
+            sda = board.SDA if sda is None else sda
+            if frequency is None:
+                self.i2c = busio.I2C(scl, sda)
+            else:
+                self.i2c = busio.I2C(scl, sda, frequency=frequency)
+        elif frequency is not None or scl is not None or sda is not None:
+            raise ValueError("frequency, scl and sda configure the bus QwiicScmd creates; "
+                             "set them on i2c_driver instead")
         else:
             self.i2c = i2c_driver
+        self._diag_register = bytes([self._DIAG_FIRST])
+        self._diag_buffer = bytearray(self._DIAG_LENGTH)
+        # reused command buffers, so the write paths do not allocate
+        self._cmd_buffer = bytearray(2)
+        self._drives_buffer = bytearray(35)
+        self._read_buffer = bytearray(8)
+        self._remote_buffer = bytearray(3)
+        # a remote read is in progress; others wait for it to finish
+        self._remote_busy = False
+        if shadow_config is None:
+            shadow_config = not getattr(self.i2c, "shared", False)
+        self.shadow_config = shadow_config
+        # last known value of the configuration registers, by register
+        self._shadow = {}
+        # redundant-write suppression: last value and time written, by register
+        self.suppress_redundant_writes = suppress_redundant_writes
+        self.refresh_interval = refresh_interval
+        self.writes_issued = 0
+        self.writes_suppressed = 0
+        self._written = bytearray(0x80)
+        self._written_at = [None] * 0x80
+        # set by every write that reaches the bus; see heartbeat.Heartbeat
+        self._fed = False
+        # nesting depth of the bus lock, per thread; only the holder is non-zero
+        self._held = _thread_local()
+        self.instrumentation = None
+
+    def _try_lock(self):
+        # take the bus lock, or nest inside the one this thread already holds
+        held = self._held
+        depth = getattr(held, "depth", 0)
+        if depth or self.i2c.try_lock():
+            held.depth = depth + 1
+            return True
+        return False
+
+    def _lock(self, timeout=None):
+        if self._try_lock():
+            return
+        # back off instead of spinning: 50us doubling up to _LOCK_MAX_BACKOFF
+        if timeout is None:
+            timeout = self.lock_timeout
+        deadline = time.monotonic() + timeout
+        delay = 0.00005
+        while not self._try_lock():
+            if time.monotonic() >= deadline:
+                raise RuntimeError("timed out waiting for the I2C bus lock")
+            time.sleep(delay)
+            delay = min(delay * 2, self._LOCK_MAX_BACKOFF)
+
+    def _unlock(self):
+        held = self._held
+        held.depth -= 1
+        if not held.depth:
+            self.i2c.unlock()
+
+    # session( ... )
+    #
+    #     Hold the I2C bus across several calls
+    #
+    #   timeout -- seconds to wait for the bus, default lock_timeout
+    def session(self, timeout=None):
+        """
+            Hold the I2C bus lock for a sequence of calls
+
+            Use as ``with motor.session():``. The lock is taken once, waiting
+            up to timeout seconds with backoff, and every QwiicScmd call
+            inside the block reuses it instead of locking on its own.
+            Sessions nest.
 
-    def is_connected(self):
+            :param timeout: seconds to wait for the bus, default lock_timeout
+
+            :return: context manager whose ``as`` target is the driver
+
+        """
+        return _Session(self, timeout)
+
+    def _write_register(self, register, value):
+        # caller holds the lock
+        buffer = self._cmd_buffer
+        buffer[0] = register
+        buffer[1] = value
+        self.i2c.writeto(self.address, buffer)
+        self._fed = True
+        if self.suppress_redundant_writes:
+            self.writes_issued += 1
+
+    def _is_redundant(self, register, value):
+        # True if the write can be skipped; otherwise records it as written
+        if not self.suppress_redundant_writes:
+            return False
+        now = time.monotonic()
+        written_at = self._written_at[register]
+        if (written_at is not None and self._written[register] == value
+                and now - written_at < self.refresh_interval):
+            self.writes_suppressed += 1
+            return True
+        self._written[register] = value
+        self._written_at[register] = now
+        return False
+
+    def _write_state(self, register, value):
+        # caller holds the lock; a drive/config write, subject to suppression
+        if self._is_redundant(register, value):
+            return
+        try:
+            self._write_register(register, value)
+        except Exception:
+            self._written_at[register] = None
+            raise
+
+    def _read_registers(self, register, count):
+        # caller holds the lock; result is in self._read_buffer[:count]
+        self._cmd_buffer[0] = register
+        self.i2c.writeto_then_readfrom(self.address, self._cmd_buffer, self._read_buffer,
+                                       out_end=1, in_end=count)
+        return self._read_buffer
+
+    def _write_config(self, register, value):
+        # caller holds the lock
+        if not self.shadow_config:
+            # what this driver last wrote says nothing about the board
+            self._write_register(register, value)
+            return
+        self._write_state(register, value)
+        self._shadow[register] = value
+
+    def _shadowed(self, register):
+        # last known value of a configuration register, None if unknown
+        if not self.shadow_config:
+            return None
+        return self._shadow.get(register)
+
+    def _hold(self):
+        # a read and the write that depends on it (read-modify-write, page
+        # selection and paged access) run under this; on a shared bus
+        # without the shadow it keeps other clients off in between
+        if self.shadow_config:
+            return _UNHELD
+        hold = getattr(self.i2c, "hold", None)
+        return _UNHELD if hold is None else hold()
+
+    def _write_values(self, values):
+        # caller holds the lock; values: dict of register: value, written
+        # with _write_packed. Registers whose write failed lose their
+        # suppression record.
         try:
-            while not self.i2c.try_lock(): pass
-            return self.address in self.i2c.scan()
+            _write_packed(self.i2c, self.address, self._drives_buffer, values)
+        except Exception:
+            for register in values:
+                self._written_at[register] = None
+            raise
+        self._fed = True
+        if self.suppress_redundant_writes:
+            self.writes_issued += len(values)
+
+    def _write_registers(self, values):
+        # caller holds the lock; values: dict of register: value for
+        # unpaged configuration registers, written in ascending order with
+        # consecutive registers packed into one auto-incrementing write
+        for register in values:
+            # the suppression record no longer matches what is written
+            self._written_at[register] = None
+        try:
+            self._write_values(values)
+        except Exception:
+            for register in values:
+                self._shadow.pop(register, None)
+            raise
+        if self.shadow_config:
+            self._shadow.update(values)
+
+    def _write_config_bit(self, register, bit, value):
+        # caller holds the lock; read-modify-write against the shadow
+        with self._hold():
+            current = self._shadowed(register)
+            if current is None:
+                current = self._read_registers(register, 1)[0]
+            self._write_config(register, (current & ~(1 << bit) & 0xFF) | ((value & 0x01) << bit))
+
+    # refresh( ... )
+    #
+    #     Reload the configuration shadow from the SCMD
+    #
+    def refresh(self):
+        """
+            Reload the shadow of the configuration registers (inversion,
+            bridging, page and enable) from the SCMD
+
+            Normally the shadow is filled lazily and kept up to date by the
+            setters; call this after the board was changed behind the
+            driver's back. The suppression record of the reloaded registers
+            is dropped, so the next write to each of them reaches the bus.
+
+            :return: No return value
+
+        """
+        self._lock()
+        try:
+            for first, count in self._SHADOW_BLOCKS:
+                data = self._read_registers(first, count)
+                for i in range(count):
+                    self._shadow[first + i] = data[i]
+                    # the board may differ from what was last written
+                    self._written_at[first + i] = None
         finally:
-            self.i2c.unlock()
+            self._unlock()
+
+    # invalidate( ... )
+    #
+    #     Forget the configuration shadow
+    #
+    def invalidate(self):
+        """
+            Forget the shadow of the configuration registers; each register
+            is read from the SCMD again the next time it is modified. The
+            record of written values used for redundant-write suppression is
+            dropped as well.
+
+            :return: No return value
+
+        """
+        self._shadow.clear()
+        for register in range(len(self._written_at)):
+            self._written_at[register] = None
+
+    # enable_instrumentation( ... )
+    #
+    #     Count bus use per method
+    #
+    def enable_instrumentation(self, bounds=None):
+        """
+            Start counting transactions, bytes, lock wait and call latency
+            per method; see instrumentation.py. Until this is called the
+            driver carries no instrumentation overhead.
+
+            :param bounds: histogram bucket bounds in seconds, optional
+
+            :return: the Instrumentation, whose snapshot() exports the counters
+
+        """
+        if self.instrumentation is None:
+            from .instrumentation import Instrumentation, DEFAULT_BOUNDS
+            self.instrumentation = Instrumentation(bounds or DEFAULT_BOUNDS)
+            self.instrumentation.attach(self)
+        return self.instrumentation
+
+    def disable_instrumentation(self):
+        """
+            Stop counting and remove the instrumentation wrappers
+
+            :return: the Instrumentation with the counters gathered so far,
+                or None if it was not enabled
+
+        """
+        instrumentation = self.instrumentation
+        if instrumentation is not None:
+            instrumentation.detach()
+            self.instrumentation = None
+        return instrumentation
+
+    # write_counts( ... )
+    #
+    #     Issued and suppressed register writes
+    #
+    def write_counts(self):
+        """
+            Register writes issued to the bus and writes skipped while
+            redundant-write suppression is on
+
+            :return: issued and suppressed counts
+            :rtype: dict
+
+        """
+        return {"issued": self.writes_issued, "suppressed": self.writes_suppressed}
+
+    # is_connected( ... )
+    #
+    #     Check that the SCMD answers at its address
+    #
+    #   max_age -- use a shared bus scan up to this many seconds old
+    def is_connected(self, max_age=None):
+        """
+            Check that the SCMD answers at its address
+
+            By default only self.address is probed. With max_age (or
+            scan_cache_ttl) set, the answer comes from a bus scan shared by
+            all QwiicScmd instances on the same bus, rescanning only when the
+            cached scan is older than max_age.
+
+            :param max_age: seconds a shared scan may be old, default scan_cache_ttl
+
+            :return: True if the device acknowledged
+            :rtype: bool
+
+        """
+        if max_age is None:
+            max_age = self.scan_cache_ttl
+        if max_age is not None:
+            return self.address in self.scan(max_age)
+        self._lock()
+        try:
+            # empty write first, as busdevice does; some hosts only support reads
+            try:
+                self.i2c.writeto(self.address, b"")
+                return True
+            except OSError:
+                pass
+            try:
+                self.i2c.readfrom_into(self.address, self._read_buffer, end=1)
+                return True
+            except OSError:
+                return False
+        finally:
+            self._unlock()
+
+    # scan( ... )
+    #
+    #     Addresses on this driver's bus, shared across instances
+    #
+    #   max_age -- reuse a scan up to this many seconds old
+    def scan(self, max_age=None):
+        """
+            Scan the I2C bus, or reuse a scan that any QwiicScmd on the same
+            bus made less than max_age seconds ago
+
+            :param max_age: seconds a cached scan may be old; None always scans
+
+            :return: addresses that acknowledged
+            :rtype: list
+
+        """
+        now = time.monotonic()
+        bus = getattr(self.i2c, "wrapped_bus", self.i2c)
+        cached = _scan_cache.get(bus)
+        if max_age is not None and cached is not None and now - cached[0] <= max_age:
+            return cached[1]
+        self._lock()
+        try:
+            found = self.i2c.scan()
+        finally:
+            self._unlock()
+        _scan_cache[bus] = (now, found)
+        return found
 
     @property
     def connected(self):
         return self.is_connected()
 
     def begin(self):
+        self._lock()
         try:
-            while not self.i2c.try_lock(): pass
-            self.i2c.readfrom(self.address, 1)  # dummy read
-            return self.i2c.readfrom(self.address, 1)
+            self._read_registers(self.SCMD_ID, 1)  # dummy read
+            return self._read_registers(self.SCMD_ID, 1)[0]
         finally:
-            self.i2c.unlock()
+            self._unlock()
 
     def ready(self):
+        self._lock()
         try:
-            while not self.i2c.try_lock(): pass
-            status_byte = self.i2c.readfrom(self.address, 1)[0]
+            status_byte = self._read_registers(self.SCMD_STATUS_1, 1)[0]
         finally:
-            self.i2c.unlock()
-        return status_byte & 0x01 and status_byte != 0xFF
+            self._unlock()
+        return self._is_ready(status_byte)
 
     def busy(self):
+        self._lock()
         try:
-            while not self.i2c.try_lock(): pass
-            status_byte = self.i2c.readfrom(self.address, 1)[0]
+            status_byte = self._read_registers(self.SCMD_STATUS_1, 1)[0]
         finally:
-            self.i2c.unlock()
-        return status_byte & (0x02 | 0x04 | 0x08) != 0
+            self._unlock()
+        return not self._is_idle(status_byte)
+
+    def _is_ready(self, status_byte):
+        return status_byte & self.SCMD_ENUMERATION_BIT and status_byte != 0xFF
+
+    def _is_idle(self, status_byte):
+        return status_byte & (self.SCMD_BUSY_BIT | self.SCMD_REM_READ_BIT | self.SCMD_REM_WRITE_BIT) == 0
+
+    def _wait_status(self, done, timeout):
+        # poll STATUS_1 until done(status) with growing sleeps; short sleeps
+        # keep the bus lock, longer ones release it for other users
+        start = time.monotonic()
+        delay = 0.0
+        while True:
+            self._lock()
+            try:
+                while True:
+                    if done(self._read_registers(self.SCMD_STATUS_1, 1)[0]):
+                        return time.monotonic() - start
+                    if time.monotonic() - start >= timeout:
+                        raise RuntimeError("SCMD status wait timed out after %g s" % timeout)
+                    delay = delay * 2 if delay else self._POLL_MIN
+                    if delay > self._POLL_HOLD_MAX:
+                        break
+                    time.sleep(delay)
+            finally:
+                self._unlock()
+            time.sleep(min(delay, self._POLL_MAX, max(0.0, start + timeout - time.monotonic())))
+
+    # wait_ready( ... )
+    #
+    #     Wait for the SCMD to finish enumerating
+    #
+    #   timeout -- seconds to wait
+    def wait_ready(self, timeout=2.0):
+        """
+            Wait until the status register reports enumeration done
+
+            Polls fast at first (200 us, doubling) under a single lock hold;
+            once the sleeps grow past 1 ms the lock is released between
+            polls, and sleeps are capped at 20 ms.
+
+            :param timeout: seconds to wait
+
+            :return: seconds waited
+            :rtype: float
+            :raises RuntimeError: if not ready within timeout
+
+        """
+        return self._wait_status(self._is_ready, timeout)
+
+    # wait_idle( ... )
+    #
+    #     Wait for pending operations (busy, remote read/write) to finish
+    #
+    #   timeout -- seconds to wait
+    def wait_idle(self, timeout=1.0):
+        """
+            Wait until the status register shows no busy, remote read or
+            remote write in progress; polls like wait_ready()
+
+            :param timeout: seconds to wait
+
+            :return: seconds waited
+            :rtype: float
+            :raises RuntimeError: if still busy after timeout
+
+        """
+        return self._wait_status(self._is_idle, timeout)
 
     def enable(self):
+        self._lock()
         try:
-            while not self.i2c.try_lock(): pass
-            self.i2c.writeto(self.address, bytes([0x70, 0x01]))
+            self._write_config(self.SCMD_DRIVER_ENABLE, 0x01)
         finally:
-            self.i2c.unlock()
+            self._unlock()
 
     def disable(self):
+        self._lock()
         try:
-            while not self.i2c.try_lock(): pass
-            self.i2c.writeto(self.address, bytes([0x70, 0x00]))
+            self._write_config(self.SCMD_DRIVER_ENABLE, 0x00)
         finally:
-            self.i2c.unlock()
+            self._unlock()
 
     def set_drive(self, motor_num, direction, level):
-        level = round((level + 1 - direction) / 2)
-        drive_value = 0
         if motor_num < 34:
-            drive_value = (level * direction) + (level * (direction - 1))
-            drive_value += 128
+            drive_value = _drive_byte(direction, level)
+            self._lock()
             try:
-                while not self.i2c.try_lock(): pass
-                self.i2c.writeto(self.address, bytes([0x20 + motor_num, drive_value]))
+                self._write_state(self.SCMD_MA_DRIVE + motor_num, drive_value)
             finally:
-                self.i2c.unlock()
+                self._unlock()
+
+    # set_drives( ... )
+    #
+    #     Set several motors with as few I2C transactions as possible
+    #
+    #   drives -- dict of motor_num: (direction, level)
+    def set_drives(self, drives):
+        """
+            Set the drive of several motors at once
+
+            Consecutive motor numbers are packed into one auto-incrementing
+            write starting at their first drive register, and every write
+            happens under a single lock hold. With redundant-write suppression
+            on, unchanged motors are left out of the writes.
+
+            :param drives: dict of motor_num: (direction, level), motor_num 0 to 33,
+                direction 0 or 1, level 0 to 255
+
+            :return: No return value
+            :raises ValueError: if a direction or level is out of range
+
+        """
+        self._lock()
+        try:
+            values = {}
+            for motor_num, (direction, level) in drives.items():
+                if motor_num < 34:
+                    values[self.SCMD_MA_DRIVE + motor_num] = _drive_byte(direction, level)
+            # every drive byte is known before any is recorded as written, so
+            # a bad entry leaves the suppression record untouched
+            values = {register: value for register, value in values.items()
+                      if not self._is_redundant(register, value)}
+            if values:
+                self._write_values(values)
+        finally:
+            self._unlock()
 
     def inversion_mode(self, motor_num, polarity):
         reg_temp = 0
         if motor_num < 2:
+            self._lock()
             try:
-                while not self.i2c.try_lock(): pass
-                self.i2c.writeto(self.address, bytes([0x12 + motor_num, polarity & 0x01]))
+                self._write_config(self.SCMD_MOTOR_A_INVERT + motor_num, polarity & 0x01)
             finally:
-                self.i2c.unlock()
+                self._unlock()
         else:
             if motor_num < 10:
-                reg_temp = 0x50
+                reg_temp = self.SCMD_INV_2_9
                 motor_num -= 2
             elif motor_num < 18:
-                reg_temp = 0x51
+                reg_temp = self.SCMD_INV_10_17
                 motor_num -= 10
             elif motor_num < 26:
-                reg_temp = 0x52
+                reg_temp = self.SCMD_INV_18_25
                 motor_num -= 18
             elif motor_num < 34:
-                reg_temp = 0x53
+                reg_temp = self.SCMD_INV_26_33
                 motor_num -= 26
             else:
                 return
+            self._lock()
             try:
-                while not self.i2c.try_lock(): pass
-                data = self.i2c.readfrom(self.address, 1)[0] & (~(1 << motor_num) & 0xFF)
-                self.i2c.writeto(self.address, bytes([reg_temp, data | ((polarity & 0x01) << motor_num)]))
+                self._write_config_bit(reg_temp, motor_num, polarity)
             finally:
-                self.i2c.unlock()
+                self._unlock()
 
     def bridging_mode(self, driver_num, bridged):
         reg_temp = 0
         if driver_num < 1:
+            self._lock()
             try:
-                while not self.i2c.try_lock(): pass
-                self.i2c.writeto(self.address, bytes([0x14, bridged & 0x01]))
+                self._write_config(self.SCMD_BRIDGE, bridged & 0x01)
             finally:
-                self.i2c.unlock()
+                self._unlock()
         else:
             if driver_num < 9:
-                reg_temp = 0x54
+                reg_temp = self.SCMD_BRIDGE_SLV_L
                 driver_num -= 1
             elif driver_num < 17:
-                reg_temp = 0x55
+                reg_temp = self.SCMD_BRIDGE_SLV_H
                 driver_num -= 9
             else:
                 return
+            self._lock()
             try:
-                while not self.i2c.try_lock(): pass
-                data = self.i2c.readfrom(self.address, 1)[0] & (~(1 << driver_num) & 0xFF)
-                self.i2c.writeto(self.address, bytes([reg_temp, data | ((bridged & 0x01) << driver_num)]))
+                self._write_config_bit(reg_temp, driver_num, bridged)
             finally:
-                self.i2c.unlock()
+                self._unlock()
 
     def get_diagnostics(self):
+        """
+            Read the diagnostic counters of the master
+
+            All counters are fetched with one block read of the contiguous
+            range U_I2C_RD_ERR..REG_RO_WRITE_CNT.
+
+            :return: the counters
+            :rtype: SCMDDiagnostics
+
+        """
+        self.read_diagnostics_into(self._diag_buffer)
+        return self._decode_diagnostics(self._diag_buffer)
+
+    # read_diagnostics_into( ... )
+    #
+    #     Raw diagnostic counters, without decoding
+    #
+    #   buffer -- bytearray (or other writable buffer) to read into
+    #   start -- offset in buffer
+    def read_diagnostics_into(self, buffer, start=0):
+        """
+            Read the registers U_I2C_RD_ERR..REG_RO_WRITE_CNT into
+            buffer[start:start + 13] in one block read, allocating nothing;
+            byte i is register QwiicScmd.SCMD_U_I2C_RD_ERR + i
+
+            :param buffer: writable buffer
+            :param start: offset in buffer
+
+            :return: No return value
+
+        """
+        self._lock()
+        try:
+            self.i2c.writeto_then_readfrom(self.address, self._diag_register, buffer,
+                                           in_start=start, in_end=start + self._DIAG_LENGTH)
+        finally:
+            self._unlock()
+
+    def _decode_diagnostics(self, data):
         my_diag = SCMDDiagnostics()
+        first = self._DIAG_FIRST
+        my_diag.U_I2C_RD_ERR = data[self.SCMD_U_I2C_RD_ERR - first]
+        my_diag.U_I2C_WR_ERR = data[self.SCMD_U_I2C_WR_ERR - first]
+        my_diag.U_BUF_DUMPED = data[self.SCMD_U_BUF_DUMPED - first]
+        my_diag.E_I2C_RD_ERR = data[self.SCMD_E_I2C_RD_ERR - first]
+        my_diag.E_I2C_WR_ERR = data[self.SCMD_E_I2C_WR_ERR - first]
+        my_diag.LOOP_TIME = data[self.SCMD_LOOP_TIME - first]
+        my_diag.SLV_POLL_CNT = data[self.SCMD_SLV_POLL_CNT - first]
+        top_addr = data[self.SCMD_SLV_TOP_ADDR - first]
+        if top_addr >= self.START_SLAVE_ADDR and top_addr <= self.MAX_SLAVE_ADDR:
+            my_diag.numberOfSlaves = top_addr - self.START_SLAVE_ADDR + 1
+        my_diag.MST_E_ERR = data[self.SCMD_MST_E_ERR - first]
+        my_diag.MST_E_STATUS = data[self.SCMD_MST_E_STATUS - first]
+        my_diag.FSAFE_FAULTS = data[self.SCMD_FSAFE_FAULTS - first]
+        my_diag.REG_OOR_CNT = data[self.SCMD_REG_OOR_CNT - first]
+        my_diag.REG_RO_WRITE_CNT = data[self.SCMD_REG_RO_WRITE_CNT - first]
+        return my_diag
+
+    def _start_remote_read(self, address, offset):
+        # caller holds the lock; False if another caller's remote read on
+        # this driver is still in progress. Call _end_remote_read() after a
+        # successful start.
+        if self._remote_busy:
+            return False
+        buffer = self._remote_buffer
+        buffer[0] = self.SCMD_REM_ADDR
+        buffer[1] = address
+        buffer[2] = offset
+        self.i2c.writeto(self.address, buffer)
+        self._write_register(self.SCMD_REM_READ, 1)
+        self._remote_busy = True
+        return True
+
+    def _end_remote_read(self):
+        self._remote_busy = False
+
+    def _poll_remote_read(self, address, offset):
+        # caller holds the lock; the register value, or None while pending.
+        # STATUS_1..REM_READ in one read: status bit, REM_ADDR/REM_OFFSET,
+        # result and the trigger register, which the firmware clears once
+        # the read is done
+        first = self.SCMD_STATUS_1
+        data = self._read_registers(first, self.SCMD_REM_READ - first + 1)
+        if data[self.SCMD_REM_ADDR - first] != address or data[self.SCMD_REM_OFFSET - first] != offset:
+            # another driver used the remote registers while the lock was free
+            self._remote_busy = False
+            self._start_remote_read(address, offset)
+            return None
+        if not data[0] & self.SCMD_REM_READ_BIT and not data[self.SCMD_REM_READ - first]:
+            return data[self.SCMD_REM_DATA_RD - first]
+        return None
+
+    def _read_remote(self, address, offset):
+        # one register of an expansion slave; polls like _wait_status(), so
+        # waits longer than _POLL_HOLD_MAX release the bus lock
+        start = time.monotonic()
+        timeout = self.lock_timeout
+        delay = 0.0
+        started = False
         try:
-            while not self.i2c.try_lock(): pass
-            my_diag.U_I2C_RD_ERR = self.i2c.readfrom(self.address, 1)[0]
-            my_diag.U_I2C_WR_ERR = self.i2c.readfrom(self.address, 1)[0]
-            my_diag.U_BUF_DUMPED = self.i2c.readfrom(self.address, 1)[0]
-            my_diag.E_I2C_RD_ERR = self.i2c.readfrom(self.address, 1)[0]
-            my_diag.E_I2C_WR_ERR = self.i2c.readfrom(self.address, 1)[0]
-            my_diag.LOOP_TIME = self.i2c.readfrom(self.address, 1)[0]
-            my_diag.SLV_POLL_CNT = self.i2c.readfrom(self.address, 1)[0]
-            top_addr = self.i2c.readfrom(self.address, 1)[0]
-            if top_addr >= 0x50 and top_addr < 0x60:
-                my_diag.numberOfSlaves = top_addr - 0x50 + 1
-            my_diag.MST_E_ERR = self.i2c.readfrom(self.address, 1)[0]
-            my_diag.MST_E_STATUS = self.i2c.readfrom(self.address, 1)[0]
-            my_diag.FSAFE_FAULTS = self.i2c.readfrom(self.address, 1)[0]
-            my_diag.REG_OOR_CNT = self.i2c.readfrom(self.address, 1)[0]
-            my_diag.REG_RO_WRITE_CNT = self.i2c.readfrom(self.address, 1)[0]
+            while True:
+                self._lock()
+                try:
+                    while True:
+                        if not started:
+                            # waiting for another caller's remote read is
+                            # bounded like waiting for the lock
+                            started = self._start_remote_read(address, offset)
+                            if started:
+                                start = time.monotonic()
+                                timeout = self.remote_timeout
+                        if started:
+                            value = self._poll_remote_read(address, offset)
+                            if value is not None:
+                                return value
+                        if time.monotonic() - start >= timeout:
+                            raise RuntimeError("remote read of slave 0x%02X timed out" % address)
+                        delay = delay * 2 if delay else self._POLL_MIN
+                        if delay > self._POLL_HOLD_MAX:
+                            break
+                        time.sleep(delay)
+                finally:
+                    self._unlock()
+                time.sleep(min(delay, self._POLL_MAX, max(0.0, start + timeout - time.monotonic())))
         finally:
-            self.i2c.unlock()
+            if started:
+                self._end_remote_read()
+
+    def _remote_diagnostics(self, address):
+        my_diag = SCMDDiagnostics()
+        for name, register in self._REMOTE_DIAG:
+            setattr(my_diag, name, self._read_remote(address, register))
         return my_diag
 
+    # get_remote_diagnostics( ... )
+    #
+    #     Read the diagnostic counters of an expansion slave
+    #
+    #   address -- slave address, START_SLAVE_ADDR (0x50) and up
     def get_remote_diagnostics(self, address):
-        my_diag = SCMDDiagnostics()
-        my_diag.numberOfSlaves = 0
-        my_diag.U_I2C_RD_ERR = 0
+        """
+            Read the diagnostic counters of one expansion slave through the
+            master's remote access registers
+
+            Only the counters a slave keeps are read (E_I2C_RD_ERR,
+            E_I2C_WR_ERR, LOOP_TIME, FSAFE_FAULTS, REG_OOR_CNT and
+            REG_RO_WRITE_CNT); the others stay 0. Each register takes one
+            write of REM_ADDR/REM_OFFSET, one write of REM_READ and one block
+            read that returns the status and the data together. Polling
+            keeps the bus lock for short waits and releases it once the
+            sleeps grow past 1 ms, like wait_ready().
+
+            :param address: slave address, 0x50 to 0x5F
+
+            :return: the counters
+            :rtype: SCMDDiagnostics
+            :raises RuntimeError: if a remote read does not complete within
+                remote_timeout
+
+        """
+        return self._remote_diagnostics(address)
+
+    # get_all_remote_diagnostics( ... )
+    #
+    #     Diagnostics of every enumerated expansion slave
+    #
+    #   slaves -- number of slaves, None to read it from the master
+    def get_all_remote_diagnostics(self, slaves=None):
+        """
+            Read the diagnostic counters of every expansion slave, one
+            get_remote_diagnostics() after the other
+
+            :param slaves: number of enumerated slaves; None takes
+                numberOfSlaves from get_diagnostics()
+
+            :return: dict of slave address: SCMDDiagnostics, in address order
+            :rtype: dict
+
+        """
+        if slaves is None:
+            slaves = self.get_diagnostics().numberOfSlaves
+        result = {}
+        for address in range(self.START_SLAVE_ADDR, self.START_SLAVE_ADDR + slaves):
+            result[address] = self._remote_diagnostics(address)
+        return result
 
     # ****************************************************************************#
     #
@@ -181,6 +987,57 @@ class QwiicScmd:
     #
     # ****************************************************************************#
 
+    # set_fail_safe_time( ... )
+    #
+    #     Arm the fail-safe timer
+    #
+    #   milliseconds -- 1 to 255, 0 turns the fail-safe off
+    def set_fail_safe_time(self, milliseconds):
+        """
+            Set the fail-safe timeout: if no write reaches the SCMD for this
+            long, every motor is stopped and FSAFE_FAULTS counts up
+
+            :param milliseconds: 1 to 255, 0 turns the fail-safe off
+
+            :return: No return value
+
+        """
+        self._lock()
+        try:
+            self._write_config(self.SCMD_FSAFE_TIME, milliseconds & 0xFF)
+        finally:
+            self._unlock()
+
+    def get_fail_safe_time(self):
+        self._lock()
+        try:
+            milliseconds = self._shadowed(self.SCMD_FSAFE_TIME)
+            if milliseconds is None:
+                milliseconds = self._read_registers(self.SCMD_FSAFE_TIME, 1)[0]
+                if self.shadow_config:
+                    self._shadow[self.SCMD_FSAFE_TIME] = milliseconds
+        finally:
+            self._unlock()
+        return milliseconds
+
+    # keep_alive( ... )
+    #
+    #     Feed the fail-safe timer without changing anything
+    #
+    def keep_alive(self):
+        """
+            Rewrite the fail-safe timeout with its current value, which
+            feeds the timer; never suppressed as redundant
+
+            :return: No return value
+
+        """
+        self._lock()
+        try:
+            self._write_register(self.SCMD_FSAFE_TIME, self.get_fail_safe_time())
+        finally:
+            self._unlock()
+
     # fault_safe_drive( ... )
     #
     #    Disable drive to both motors
@@ -192,11 +1049,14 @@ class QwiicScmd:
             :return: No return value
 
         """
+        self._lock()
         try:
-            while not self.i2c.try_lock(): pass
-            self._i2c.writeByte(self.address, self.SCMD_FSAFE_CTRL, self.SCMD_FSAFE_DRIVE_KILL)
+            self._write_register(self.SCMD_FSAFE_CTRL, self.SCMD_FSAFE_DRIVE_KILL)
         finally:
-            self.i2c.unlock()
+            self._unlock()
+        # the kill clears the driver enable
+        self._shadow.pop(self.SCMD_DRIVER_ENABLE, None)
+        self._written_at[self.SCMD_DRIVER_ENABLE] = None
 
     # fault_safe_restart( ... )
     #
@@ -209,11 +1069,12 @@ class QwiicScmd:
             :return: No return value
 
         """
+        self._lock()
         try:
-            while not self.i2c.try_lock(): pass
-            self._i2c.writeByte(self.address, self.SCMD_FSAFE_CTRL, self.SCMD_FSAFE_RESTART_MASK)
+            self._write_register(self.SCMD_FSAFE_CTRL, self.SCMD_FSAFE_RESTART_MASK)
         finally:
-            self.i2c.unlock()
+            self._unlock()
+        self.invalidate()
 
     # fault_safe_reboot( ... )
     #
@@ -223,14 +1084,17 @@ class QwiicScmd:
         """
             Reboot slave controllers
 
+            The configuration shadow is invalidated; see refresh().
+
             :return: No return value
 
         """
+        self._lock()
         try:
-            while not self.i2c.try_lock(): pass
-            self._i2c.writeByte(self.address, self.SCMD_FSAFE_CTRL, self.SCMD_FSAFE_REBOOT)
+            self._write_register(self.SCMD_FSAFE_CTRL, self.SCMD_FSAFE_REBOOT)
         finally:
-            self.i2c.unlock()
+            self._unlock()
+        self.invalidate()
 
     # fault_safe_re_enum( ... )
     #
@@ -243,11 +1107,12 @@ class QwiicScmd:
             :return: No return value
 
         """
+        self._lock()
         try:
-            while not self.i2c.try_lock(): pass
-            self._i2c.writeByte(self.address, self.SCMD_FSAFE_CTRL, self.SCMD_FSAFE_RE_ENUM)
+            self._write_register(self.SCMD_FSAFE_CTRL, self.SCMD_FSAFE_RE_ENUM)
         finally:
-            self.i2c.unlock()
+            self._unlock()
+        self.invalidate()
 
     # fault_safe_cycle_user( ... )
     #
@@ -260,11 +1125,11 @@ class QwiicScmd:
             :return: No return value
 
         """
+        self._lock()
         try:
-            while not self.i2c.try_lock(): pass
-            self._i2c.writeByte(self.address, self.SCMD_FSAFE_CTRL, self.SCMD_FSAFE_CYCLE_USER)
+            self._write_register(self.SCMD_FSAFE_CTRL, self.SCMD_FSAFE_CYCLE_USER)
         finally:
-            self.i2c.unlock()
+            self._unlock()
 
     # fault_safe_cycle_exp( ... )
     #
@@ -277,11 +1142,11 @@ class QwiicScmd:
             :return: No return value
 
         """
+        self._lock()
         try:
-            while not self.i2c.try_lock(): pass
-            self._i2c.writeByte(self.address, self.SCMD_FSAFE_CTRL, self.SCMD_FSAFE_CYCLE_EXP)
+            self._write_register(self.SCMD_FSAFE_CTRL, self.SCMD_FSAFE_CYCLE_EXP)
         finally:
-            self.i2c.unlock()
+            self._unlock()
 
     # ****************************************************************************#
     #
@@ -297,24 +1162,35 @@ class QwiicScmd:
         """
             Get the I2C page the SCMD is currently using
 
+            The page is read from the SCMD only if it is not already known
+            from the configuration shadow.
+
             :return: Returns the page number
             :rtype: integer
 
         """
 
-        # first read
-        try:
-            while not self.i2c.try_lock(): pass
-            data = self._i2c.readByte(self.address, self.SCMD_PAGE_SELECT)
-        finally:
-            self.i2c.unlock()
-
-        # second read
+        self._lock()
         try:
-            while not self.i2c.try_lock(): pass
-            return self._i2c.readByte(self.address, self.SCMD_PAGE_SELECT)
+            return self._current_page()
         finally:
-            self.i2c.unlock()
+            self._unlock()
+
+    def _current_page(self):
+        # caller holds the lock; the bus is only read if the page is unknown
+        page = self._shadowed(self.SCMD_PAGE_SELECT)
+        if page is None:
+            page = self._read_registers(self.SCMD_PAGE_SELECT, 1)[0]
+            if self.shadow_config:
+                self._shadow[self.SCMD_PAGE_SELECT] = page
+        return page
+
+    def _select_page(self, page):
+        # caller holds the lock; without the shadow the page is always written
+        if self.shadow_config and self._current_page() == page:
+            return False
+        self._write_config(self.SCMD_PAGE_SELECT, page)
+        return True
 
     # select_page( ... )
     #
@@ -325,24 +1201,32 @@ class QwiicScmd:
         """
             Set the I2C page the SCMD is currently using
 
+            The page is tracked locally, so selecting the current page costs
+            no bus traffic (unless shadow_config is off).
+
             :param page: Page number 0 to 3
 
-            :return: No return value
+            :return: True if the page had to be changed
+            :rtype: bool
 
         """
 
-        # Read the status reg
-        current_page = self.get_page()
+        self._lock()
+        try:
+            return self._select_page(page)
+        finally:
+            self._unlock()
 
-        if current_page != page:
-            try:
-                while not self.i2c.try_lock(): pass
-                self._i2c.writeByte(self.address, self.SCMD_PAGE_SELECT, page)
-            finally:
-                self.i2c.unlock()
-            return True
-        else:
-            return False
+    # _user_voltage_register( ... )
+    #
+    #     Controller 0 (the master) keeps its user voltage at
+    #     U_PORT_CLKDIV_U; every expansion controller at E_PORT_CLKDIV_U.
+    #     No page mapping is documented for them, so no page is selected.
+    #
+    def _user_voltage_register(self, controllerNum):
+        if controllerNum < 1:
+            return self.SCMD_U_PORT_CLKDIV_U
+        return self.SCMD_E_PORT_CLKDIV_U
 
     # get_user_voltage( ... )
     #
@@ -360,19 +1244,43 @@ class QwiicScmd:
 
         """
 
-        if controllerNum < 1:
-            try:
-                while not self.i2c.try_lock(): pass
-                return self._i2c.readByte(self.address, self.SCMD_U_PORT_CLKDIV_U)
-            finally:
-                self.i2c.unlock()
+        self._lock()
+        try:
+            return self._read_registers(self._user_voltage_register(controllerNum), 1)[0]
+        finally:
+            self._unlock()
 
-        else:
-            try:
-                while not self.i2c.try_lock(): pass
-                return self._i2c.readByte(self.address, self.SCMD_E_PORT_CLKDIV_U)
-            finally:
-                self.i2c.unlock()
+    # get_user_voltages( ... )
+    #
+    #     Get the user voltage of several motor controllers
+    #
+    #   controllers -- iterable of controller numbers from 0 to 16
+    def get_user_voltages(self, controllers):
+        """
+            Get the user voltage of several motor controllers
+
+            Each register is read once, under a single lock hold; the
+            expansion controllers (1 to 16) share E_PORT_CLKDIV_U.
+
+            :param controllers: iterable of controller numbers from 0 to 16
+
+            :return: dict of controllerNum: user voltage
+            :rtype: dict
+
+        """
+
+        voltages = {}
+        read = {}
+        self._lock()
+        try:
+            for controllerNum in controllers:
+                register = self._user_voltage_register(controllerNum)
+                if register not in read:
+                    read[register] = self._read_registers(register, 1)[0]
+                voltages[controllerNum] = read[register]
+        finally:
+            self._unlock()
+        return voltages
 
 
     # set_user_voltage( ... )
@@ -392,19 +1300,47 @@ class QwiicScmd:
 
         """
 
-        if controllerNum < 1:
-            try:
-                while not self.i2c.try_lock(): pass
-                self._i2c.writeByte(self.address, self.SCMD_U_PORT_CLKDIV_U, voltage)
-            finally:
-                self.i2c.unlock()
+        self._lock()
+        try:
+            # not subject to redundant-write suppression
+            self._write_register(self._user_voltage_register(controllerNum), voltage)
+        finally:
+            self._unlock()
 
-        else:
-            try:
-                while not self.i2c.try_lock(): pass
-                self._i2c.writeByte(self.address, self.SCMD_E_PORT_CLKDIV_U, voltage)
-            finally:
-                self.i2c.unlock()
+    # set_user_voltages( ... )
+    #
+    #     Set the user voltage of several motor controllers
+    #
+    #   voltages -- dict of controllerNum: voltage
+    def set_user_voltages(self, voltages):
+        """
+            Set the user voltage of several motor controllers
+
+            Each register is written once, under a single lock hold. The
+            expansion controllers (1 to 16) share E_PORT_CLKDIV_U, so they
+            must all be given the same voltage.
+
+            :param voltages: dict of controllerNum (0 to 16): voltage (0 to 255)
+
+            :return: No return value
+            :raises ValueError: if two expansion controllers are given
+                different voltages
+
+        """
+
+        values = {}
+        for controllerNum, voltage in voltages.items():
+            register = self._user_voltage_register(controllerNum)
+            if values.get(register, voltage) != voltage:
+                raise ValueError("controllers 1 to 16 share one user voltage register")
+            values[register] = voltage
+        if not values:
+            return
+        self._lock()
+        try:
+            self._write_values(values)
+        finally:
+            self._unlock()
 
     # ****************************************************************************#
     #
@@ -0,0 +1,267 @@
+# asyncio front end for QwiicScmd
+#
+# Methods are coroutines. Waiting for the I2C bus lock, for the SCMD to
+# finish enumerating, for remote reads and between diagnostic polls yields
+# to the event loop instead of blocking it. The transactions themselves are
+# short and run synchronously through a QwiicScmd instance.
+
+import asyncio
+import time
+
+from . import QwiicScmd, SCMDDiagnostics
+
+
+class AsyncQwiicScmd:
+    """
+        Coroutine counterpart of QwiicScmd
+
+        The bus lock is never held across an await, so other coroutines that
+        use the bus (including other drivers) interleave between calls.
+
+        :param address: I2C address, default 0x5D
+        :param i2c_driver: busio.I2C compatible bus, e.g. SimulatedI2C
+        :param lock_timeout: seconds to wait for the bus lock
+        :param kwargs: passed on to QwiicScmd
+
+    """
+
+    # longest sleep between lock attempts and between ready polls
+    _MAX_BACKOFF = 0.005
+
+    def __init__(self, address=None, i2c_driver=None, lock_timeout=1.0, **kwargs):
+        self.driver = QwiicScmd(address, i2c_driver, **kwargs)
+        self.lock_timeout = lock_timeout
+
+    @property
+    def address(self):
+        return self.driver.address
+
+    @property
+    def i2c(self):
+        return self.driver.i2c
+
+    async def _acquire(self):
+        driver = self.driver
+        if driver._try_lock():
+            return
+        deadline = time.monotonic() + self.lock_timeout
+        delay = 0.00005
+        while not driver._try_lock():
+            if time.monotonic() >= deadline:
+                raise RuntimeError("timed out waiting for the I2C bus lock")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self._MAX_BACKOFF)
+
+    async def _call(self, method, *args):
+        await self._acquire()
+        try:
+            return method(*args)
+        finally:
+            self.driver._unlock()
+
+    # begin( ... )
+    #
+    #     Wait for enumeration to finish, then read the ID
+    #
+    #   timeout -- seconds to wait for the SCMD to report ready
+    async def begin(self, timeout=2.0):
+        """
+            Wait for the SCMD to finish enumerating, then run QwiicScmd.begin()
+
+            :param timeout: seconds to wait for the ready bit
+
+            :return: what QwiicScmd.begin() returns
+            :raises RuntimeError: if the SCMD is not ready in time
+
+        """
+        await self.wait_ready(timeout)
+        return await self._call(self.driver.begin)
+
+    async def wait_ready(self, timeout=2.0):
+        """
+            Poll the status register until the SCMD reports ready, sleeping
+            between polls (1 ms doubling up to 5 ms)
+
+            :param timeout: seconds to wait
+
+            :return: seconds waited
+            :rtype: float
+            :raises RuntimeError: if the SCMD is not ready in time
+
+        """
+        return await self._wait_status(self.ready, timeout)
+
+    async def wait_idle(self, timeout=1.0):
+        """
+            Poll the status register until no busy, remote read or remote
+            write is in progress, sleeping between polls like wait_ready()
+
+            :param timeout: seconds to wait
+
+            :return: seconds waited
+            :rtype: float
+            :raises RuntimeError: if still busy after timeout
+
+        """
+        async def idle():
+            return not await self.busy()
+        return await self._wait_status(idle, timeout)
+
+    async def _wait_status(self, done, timeout):
+        start = time.monotonic()
+        delay = 0.001
+        while not await done():
+            if time.monotonic() - start >= timeout:
+                raise RuntimeError("SCMD status wait timed out after %g s" % timeout)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self._MAX_BACKOFF)
+        return time.monotonic() - start
+
+    async def is_connected(self):
+        return await self._call(self.driver.is_connected)
+
+    async def ready(self):
+        return await self._call(self.driver.ready)
+
+    async def busy(self):
+        return await self._call(self.driver.busy)
+
+    async def enable(self):
+        return await self._call(self.driver.enable)
+
+    async def disable(self):
+        return await self._call(self.driver.disable)
+
+    async def set_drive(self, motor_num, direction, level):
+        return await self._call(self.driver.set_drive, motor_num, direction, level)
+
+    async def set_drives(self, drives):
+        return await self._call(self.driver.set_drives, drives)
+
+    async def inversion_mode(self, motor_num, polarity):
+        return await self._call(self.driver.inversion_mode, motor_num, polarity)
+
+    async def bridging_mode(self, driver_num, bridged):
+        return await self._call(self.driver.bridging_mode, driver_num, bridged)
+
+    async def refresh(self):
+        return await self._call(self.driver.refresh)
+
+    async def get_diagnostics(self):
+        return await self._call(self.driver.get_diagnostics)
+
+    async def _read_remote(self, address, offset):
+        # the lock is taken per transaction and the waits are awaited
+        driver = self.driver
+        start = time.monotonic()
+        timeout = self.lock_timeout
+        delay = driver._POLL_MIN
+        started = False
+        try:
+            while True:
+                if not started:
+                    started = await self._call(driver._start_remote_read, address, offset)
+                    if started:
+                        start = time.monotonic()
+                        timeout = driver.remote_timeout
+                if started:
+                    value = await self._call(driver._poll_remote_read, address, offset)
+                    if value is not None:
+                        return value
+                if time.monotonic() - start >= timeout:
+                    raise RuntimeError("remote read of slave 0x%02X timed out" % address)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self._MAX_BACKOFF)
+        finally:
+            if started:
+                driver._end_remote_read()
+
+    async def get_remote_diagnostics(self, address):
+        """
+            Read the diagnostic counters of one expansion slave, like
+            QwiicScmd.get_remote_diagnostics(); polls for each remote read
+            sleep on the event loop
+
+            :param address: slave address, 0x50 to 0x5F
+
+            :return: the counters
+            :rtype: SCMDDiagnostics
+            :raises RuntimeError: if a remote read does not complete within
+                remote_timeout
+
+        """
+        my_diag = SCMDDiagnostics()
+        for name, register in QwiicScmd._REMOTE_DIAG:
+            setattr(my_diag, name, await self._read_remote(address, register))
+        return my_diag
+
+    async def get_all_remote_diagnostics(self, slaves=None):
+        if slaves is None:
+            slaves = (await self.get_diagnostics()).numberOfSlaves
+        result = {}
+        for address in range(QwiicScmd.START_SLAVE_ADDR, QwiicScmd.START_SLAVE_ADDR + slaves):
+            result[address] = await self.get_remote_diagnostics(address)
+        return result
+
+    # poll_diagnostics( ... )
+    #
+    #     Async generator of diagnostics at a fixed interval
+    #
+    #   interval -- seconds between samples
+    #   count -- number of samples, None for no limit
+    async def poll_diagnostics(self, interval, count=None):
+        """
+            Yield get_diagnostics() every interval seconds, sleeping in between
+
+            :param interval: seconds between samples, measured start to start
+            :param count: number of samples, None for no limit
+
+            :return: async generator of SCMDDiagnostics
+
+        """
+        next_time = time.monotonic()
+        taken = 0
+        while count is None or taken < count:
+            yield await self.get_diagnostics()
+            taken += 1
+            next_time += interval
+            await asyncio.sleep(max(0.0, next_time - time.monotonic()))
+
+    async def set_fail_safe_time(self, milliseconds):
+        return await self._call(self.driver.set_fail_safe_time, milliseconds)
+
+    async def get_fail_safe_time(self):
+        return await self._call(self.driver.get_fail_safe_time)
+
+    async def keep_alive(self):
+        return await self._call(self.driver.keep_alive)
+
+    async def fault_safe_drive(self):
+        return await self._call(self.driver.fault_safe_drive)
+
+    async def fault_safe_restart(self):
+        return await self._call(self.driver.fault_safe_restart)
+
+    async def fault_safe_reboot(self):
+        return await self._call(self.driver.fault_safe_reboot)
+
+    async def fault_safe_re_enum(self):
+        return await self._call(self.driver.fault_safe_re_enum)
+
+    async def fault_safe_cycle_user(self):
+        return await self._call(self.driver.fault_safe_cycle_user)
+
+    async def fault_safe_cycle_exp(self):
+        return await self._call(self.driver.fault_safe_cycle_exp)
+
+    async def get_page(self):
+        return await self._call(self.driver.get_page)
+
+    async def select_page(self, page):
+        return await self._call(self.driver.select_page, page)
+
+    async def get_user_voltage(self, controllerNum):
+        return await self._call(self.driver.get_user_voltage, controllerNum)
+
+    async def set_user_voltage(self, controllerNum, voltage):
+        return await self._call(self.driver.set_user_voltage, controllerNum, voltage)
@@ -0,0 +1,118 @@
+#-----------------------------------------------------------------------------
+# Heap allocated per call on the QwiicScmd write paths.
+#-----------------------------------------------------------------------------
+#
+# The driver runs against a bus whose transactions do nothing, so only the
+# driver's own allocations are counted. "legacy set_drive" reproduces the
+# previous round()/bytes([...]) implementation as the before figure (levels
+# stay below 255, which overflowed a byte in that version).
+#
+# On CPython the transient peak is taken from tracemalloc; on CircuitPython
+# the drop in gc.mem_free() with the collector disabled is used instead.
+#
+#   python bench_alloc.py [--calls N]
+#
+
+import argparse
+import gc
+import sys
+
+from Qwiic_SCMD_CP import QwiicScmd
+from Qwiic_SCMD_CP.diagnostics_monitor import DiagnosticsMonitor
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+class NullI2C:
+    """ busio.I2C shaped bus that accepts everything and allocates nothing """
+
+    def try_lock(self):
+        return True
+
+    def unlock(self):
+        pass
+
+    def writeto(self, address, buffer, *, start=0, end=None):
+        pass
+
+    def readfrom_into(self, address, buffer, *, start=0, end=None):
+        pass
+
+    def writeto_then_readfrom(self, address, buffer_out, buffer_in, *, out_start=0,
+                              out_end=None, in_start=0, in_end=None):
+        pass
+
+
+def legacy_set_drive(motor, motor_num, direction, level):
+    level = round((level + 1 - direction) / 2)
+    drive_value = 0
+    if motor_num < 34:
+        drive_value = (level * direction) + (level * (direction - 1))
+        drive_value += 128
+        try:
+            while not motor.i2c.try_lock(): pass
+            motor.i2c.writeto(motor.address, bytes([0x20 + motor_num, drive_value]))
+        finally:
+            motor.i2c.unlock()
+
+
+CASES = [
+    ("legacy set_drive", lambda m, i: legacy_set_drive(m, 0, 1, i % 255)),
+    ("set_drive", lambda m, i: m.set_drive(0, 1, i % 255)),
+    ("enable", lambda m, i: m.enable()),
+    ("disable", lambda m, i: m.disable()),
+    ("inversion_mode(local)", lambda m, i: m.inversion_mode(1, i & 1)),
+    ("bridging_mode(local)", lambda m, i: m.bridging_mode(0, i & 1)),
+    ("read_diagnostics_into", lambda m, i: m.read_diagnostics_into(m._diag_buffer)),
+    ("DiagnosticsMonitor.sample", lambda m, i: _monitor(m).sample()),
+]
+
+_monitors = {}
+
+
+def _monitor(motor):
+    if motor not in _monitors:
+        _monitors[motor] = DiagnosticsMonitor(motor, capacity=64)
+    return _monitors[motor]
+
+
+def bytes_per_call(motor, call, calls):
+    call(motor, 0)  # warm up caches and lazily created objects
+    if tracemalloc is not None:
+        tracemalloc.start()
+        total = 0
+        for i in range(calls):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            call(motor, i)
+            total += tracemalloc.get_traced_memory()[1] - base
+        tracemalloc.stop()
+        return total / calls
+    gc.collect()
+    gc.disable()
+    try:
+        free = gc.mem_free()
+        for i in range(calls):
+            call(motor, i)
+        return (free - gc.mem_free()) / calls
+    finally:
+        gc.enable()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Heap allocated per QwiicScmd call")
+    parser.add_argument("--calls", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    motor = QwiicScmd(i2c_driver=NullI2C())
+    print("%-24s %12s" % ("method", "bytes/call"))
+    for name, call in CASES:
+        print("%-24s %12.1f" % (name, bytes_per_call(motor, call, args.calls)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+#-----------------------------------------------------------------------------
+# Bus broker: drive writes from several client processes, coalesced per tick.
+#-----------------------------------------------------------------------------
+#
+# A BusBroker serves a realtime SimulatedI2C (transactions take their
+# modeled time). Each client process drives its own motor through
+# QwiicScmd(i2c_driver=BrokerI2C(path)) as fast as it can. Reported per
+# tick setting: client writes, bus transactions they turned into, and the
+# aggregate client write rate.
+#
+#   python bench_broker.py [--clients N] [--writes N] [--ticks 0,0.001,0.005]
+#
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+from Qwiic_SCMD_CP import QwiicScmd
+from Qwiic_SCMD_CP.broker import BusBroker, BrokerI2C
+from Qwiic_SCMD_CP.simulated_i2c import SimulatedI2C, SimulatedSCMD
+
+
+def client(path, motor_num, writes, start):
+    motor = QwiicScmd(i2c_driver=BrokerI2C(path))
+    start.wait()
+    for i in range(writes):
+        motor.set_drive(motor_num, i & 1, 100 + i % 100)
+
+
+def run(clients, writes, tick, frequency, overhead):
+    path = os.path.join(tempfile.mkdtemp(), "scmd.sock")
+    bus = SimulatedI2C({0x5D: SimulatedSCMD(slaves=16)}, frequency=frequency,
+                       transaction_overhead=overhead, realtime=True)
+    with BusBroker(bus, path, tick=tick) as broker:
+        start = multiprocessing.Event()
+        processes = [multiprocessing.Process(target=client, args=(path, n, writes, start))
+                     for n in range(clients)]
+        for process in processes:
+            process.start()
+        time.sleep(0.2)  # let every client connect
+        broker.reset_stats()
+        began = time.monotonic()
+        start.set()
+        for process in processes:
+            process.join()
+        elapsed = time.monotonic() - began
+        stats = broker.stats()
+    os.rmdir(os.path.dirname(path))
+    return clients * writes, stats["transactions"], clients * writes / elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bus broker coalescing")
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--writes", type=int, default=500, help="set_drive calls per client")
+    parser.add_argument("--ticks", default="0,0.001,0.005", help="comma separated tick lengths in seconds")
+    parser.add_argument("--frequency", type=int, default=100000)
+    parser.add_argument("--overhead-us", type=float, default=50.0)
+    args = parser.parse_args(argv)
+
+    print("%-10s %10s %10s %12s" % ("tick ms", "writes", "txns", "writes/s"))
+    for tick in (float(t) for t in args.ticks.split(",")):
+        writes, transactions, rate = run(args.clients, args.writes, tick, args.frequency,
+                                         args.overhead_us * 1e-6)
+        print("%-10g %10d %10d %12.0f" % (tick * 1e3, writes, transactions, rate))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+#-----------------------------------------------------------------------------
+# Bus cost of every public QwiicScmd method, measured on the simulated bus.
+#-----------------------------------------------------------------------------
+#
+# Each case runs against a fresh SimulatedI2C so results do not depend on
+# earlier calls. Reported per call: transactions, bytes written/read, lock
+# acquisitions and modeled bus time.
+#
+#   python bench_bus_cost.py [--frequency HZ] [--overhead-us US] [--json]
+#                            [--compare baseline.json]
+#
+# --compare exits non-zero if any method needs more transactions or bytes
+# than in the baseline, so it can gate changes to the driver.
+#
+
+import argparse
+import json
+import sys
+
+from Qwiic_SCMD_CP import QwiicScmd
+from Qwiic_SCMD_CP.mixing import DifferentialDrive, MecanumDrive
+from Qwiic_SCMD_CP.provisioning import BoardConfig, provision
+from Qwiic_SCMD_CP.simulated_i2c import SimulatedI2C, SimulatedSCMD
+
+# (name, call) pairs; names are stable keys for --compare
+CASES = [
+    ("is_connected", lambda m: m.is_connected()),
+    ("is_connected(scan cache)", lambda m: m.is_connected(max_age=60)),
+    ("connected", lambda m: m.connected),
+    ("begin", lambda m: m.begin()),
+    ("ready", lambda m: m.ready()),
+    ("busy", lambda m: m.busy()),
+    ("wait_ready", lambda m: m.wait_ready()),
+    ("wait_idle", lambda m: m.wait_idle()),
+    ("enable", lambda m: m.enable()),
+    ("disable", lambda m: m.disable()),
+    ("set_drive", lambda m: m.set_drive(0, 1, 200)),
+    ("set_drive x2", lambda m: (m.set_drive(0, 1, 200), m.set_drive(1, 0, 200))),
+    ("set_drive(suppressed)", lambda m: _suppressed(m, lambda: m.set_drive(0, 1, 200))),
+    ("set_drives(2)", lambda m: m.set_drives({0: (1, 200), 1: (0, 200)})),
+    ("set_drives(34)", lambda m: m.set_drives({n: (1, 200) for n in range(34)})),
+    ("set_drive x4", lambda m: [m.set_drive(n, 0, 200) for n in range(4)]),
+    ("DifferentialDrive.arcade", lambda m: DifferentialDrive(m).arcade(0.5, 0.2)),
+    ("MecanumDrive.drive", lambda m: MecanumDrive(m).drive(0.5, 0.3, 0.1)),
+    ("inversion_mode(local)", lambda m: m.inversion_mode(1, 1)),
+    ("inversion_mode(slave)", lambda m: m.inversion_mode(5, 1)),
+    ("inversion_mode(all slaves)", lambda m: [m.inversion_mode(n, 1) for n in range(2, 34)]),
+    ("bridging_mode(local)", lambda m: m.bridging_mode(0, 1)),
+    ("bridging_mode(slave)", lambda m: m.bridging_mode(3, 1)),
+    ("refresh", lambda m: m.refresh()),
+    ("keep_alive", lambda m: m.keep_alive()),
+    ("begin+configure+enable", lambda m: _bring_up(m)),
+    ("begin+configure+enable(session)", lambda m: _bring_up(m, session=True)),
+    ("configure by setters", lambda m: _configure_by_setters(m)),
+    ("provision", lambda m: provision(m, _CONFIG)),
+    ("get_diagnostics", lambda m: m.get_diagnostics()),
+    ("get_remote_diagnostics", lambda m: m.get_remote_diagnostics(0x50)),
+    ("get_all_remote_diagnostics(4)", lambda m: m.get_all_remote_diagnostics()),
+    ("fault_safe_drive", lambda m: m.fault_safe_drive()),
+    ("fault_safe_restart", lambda m: m.fault_safe_restart()),
+    ("fault_safe_reboot", lambda m: m.fault_safe_reboot()),
+    ("fault_safe_re_enum", lambda m: m.fault_safe_re_enum()),
+    ("fault_safe_cycle_user", lambda m: m.fault_safe_cycle_user()),
+    ("fault_safe_cycle_exp", lambda m: m.fault_safe_cycle_exp()),
+    ("get_page", lambda m: m.get_page()),
+    ("select_page", lambda m: m.select_page(1)),
+    ("get_user_voltage", lambda m: m.get_user_voltage(3)),
+    ("set_user_voltage", lambda m: m.set_user_voltage(3, 120)),
+    ("set_user_voltage x17", lambda m: [m.set_user_voltage(c, 120) for c in range(17)]),
+    ("set_user_voltages(17)", lambda m: m.set_user_voltages({c: 120 for c in range(17)})),
+    ("get_user_voltages(17)", lambda m: m.get_user_voltages(range(17))),
+]
+
+def _suppressed(motor, call):
+    # steady state of a loop repeating the same command with suppression on
+    motor.suppress_redundant_writes = True
+    motor.refresh_interval = 1e9
+    call()
+
+
+def _bring_up(motor, session=False):
+    def steps():
+        motor.begin()
+        motor.inversion_mode(1, 1)
+        motor.bridging_mode(0, 0)
+        motor.set_drives({0: (0, 0), 1: (0, 0)})
+        motor.enable()
+    if session:
+        with motor.session():
+            steps()
+    else:
+        steps()
+
+
+# a board with slaves, set up without user voltages
+_CONFIG = BoardConfig(inverted=[1, 3, 5, 20], bridged=[0, 2], fail_safe_time=100, enabled=True)
+
+
+def _configure_by_setters(motor):
+    for motor_num in sorted(_CONFIG.inverted):
+        motor.inversion_mode(motor_num, 1)
+    for driver_num in sorted(_CONFIG.bridged):
+        motor.bridging_mode(driver_num, 1)
+    motor.set_fail_safe_time(_CONFIG.fail_safe_time)
+    motor.enable()
+
+_COMPARED = ("transactions", "bytes_written", "bytes_read", "lock_acquisitions")
+
+
+def measure(call, frequency, overhead, repeat):
+    bus = SimulatedI2C({0x5D: SimulatedSCMD(slaves=4)}, frequency=frequency,
+                       transaction_overhead=overhead)
+    motor = QwiicScmd(i2c_driver=bus)
+    bus.reset_stats()
+    try:
+        for _ in range(repeat):
+            call(motor)
+    except Exception as e:
+        return {"error": "%s: %s" % (type(e).__name__, e)}
+    result = bus.stats()
+    for key in result:
+        result[key] /= repeat
+    return result
+
+
+def run(frequency, overhead, repeat, cases=CASES):
+    return {name: measure(call, frequency, overhead, repeat) for name, call in cases}
+
+
+def report(results):
+    print("%-32s %6s %6s %6s %6s %10s" % ("method", "txns", "wr", "rd", "locks", "bus us"))
+    for name, r in results.items():
+        if "error" in r:
+            print("%-32s %s" % (name, r["error"]))
+            continue
+        print("%-32s %6.1f %6.1f %6.1f %6.1f %10.1f" % (
+            name, r["transactions"], r["bytes_written"], r["bytes_read"],
+            r["lock_acquisitions"], r["bus_time"] * 1e6))
+
+
+def compare(results, baseline):
+    regressions = []
+    for name, base in baseline.items():
+        r = results.get(name)
+        if r is None or "error" in base:
+            continue
+        if "error" in r:
+            regressions.append("%s: now fails (%s)" % (name, r["error"]))
+            continue
+        for key in _COMPARED:
+            if r[key] > base[key]:
+                regressions.append("%s: %s %g -> %g" % (name, key, base[key], r[key]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bus cost of every public QwiicScmd method")
+    parser.add_argument("--frequency", type=int, default=100000, help="SCL clock in Hz")
+    parser.add_argument("--overhead-us", type=float, default=50.0,
+                        help="host latency per transaction in microseconds")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--compare", metavar="BASELINE", help="fail on regressions against a --json dump")
+    args = parser.parse_args(argv)
+
+    results = run(args.frequency, args.overhead_us * 1e-6, args.repeat)
+    if args.json:
+        json.dump(results, sys.stdout, indent=1, sort_keys=True)
+        print()
+    else:
+        report(results)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f))
+        for line in regressions:
+            print("REGRESSION", line, file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
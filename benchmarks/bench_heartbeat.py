@@ -0,0 +1,56 @@
+#-----------------------------------------------------------------------------
+# Fail-safe heartbeat: keepalives sent vs piggybacked on drive traffic.
+#-----------------------------------------------------------------------------
+#
+# A control loop runs on the simulated bus's model clock with a 100 ms
+# fail-safe time, in three phases: busy (a drive write every pass), idle
+# (passes without writes) and stalled (no passes at all). The busy phase
+# should send no keepalives, the idle phase should keep the SCMD from
+# tripping, and the stall should trip it.
+#
+#   python bench_heartbeat.py [--loop-hz HZ] [--phase-time S]
+#
+
+import argparse
+import sys
+
+from Qwiic_SCMD_CP import QwiicScmd
+from Qwiic_SCMD_CP.heartbeat import Heartbeat
+from Qwiic_SCMD_CP.simulated_i2c import SimulatedI2C, SCMD_FSAFE_FAULTS
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fail-safe heartbeat traffic")
+    parser.add_argument("--loop-hz", type=float, default=200.0)
+    parser.add_argument("--phase-time", type=float, default=2.0, help="seconds per phase")
+    parser.add_argument("--fail-safe-ms", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    bus = SimulatedI2C()
+    device = bus.devices[QwiicScmd.available_addresses[0]]
+    motor = QwiicScmd(i2c_driver=bus)
+    motor.set_fail_safe_time(args.fail_safe_ms)
+    heartbeat = Heartbeat(motor, clock=bus.now)
+    period = 1.0 / args.loop_hz
+    passes = int(args.phase_time * args.loop_hz)
+
+    print("%-10s %8s %8s %12s %8s" % ("phase", "passes", "txns", "keepalives", "faults"))
+    for phase in ("busy", "idle", "stalled"):
+        bus.reset_stats()
+        heartbeat.reset_stats()
+        for i in range(passes):
+            if phase == "stalled":
+                bus.advance(period)
+                continue
+            if phase == "busy":
+                motor.set_drive(0, 0, i % 256)
+            heartbeat.beat()
+            bus.advance(period)
+        motor.get_diagnostics()
+        print("%-10s %8d %8d %12d %8d" % (phase, passes, bus.transactions, heartbeat.sent,
+                                           device.registers[SCMD_FSAFE_FAULTS]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
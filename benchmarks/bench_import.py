@@ -0,0 +1,55 @@
+#-----------------------------------------------------------------------------
+# Import time of the package, and a check that it stays free of board/busio.
+#-----------------------------------------------------------------------------
+#
+# Each sample imports the package in a fresh interpreter and reports the
+# time spent in the import itself. Exits non-zero if the import pulled in
+# board or busio, or if the median exceeds --budget-ms.
+#
+#   python bench_import.py [--runs N] [--budget-ms MS]
+#
+
+import argparse
+import json
+import subprocess
+import sys
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import Qwiic_SCMD_CP
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "board": "board" in sys.modules, "busio": "busio" in sys.modules}))
+"""
+
+
+def sample():
+    out = subprocess.run([sys.executable, "-c", _PROBE], check=True,
+                         capture_output=True, text=True).stdout
+    return json.loads(out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Package import time")
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="fail if the median import takes longer")
+    args = parser.parse_args(argv)
+
+    samples = [sample() for _ in range(args.runs)]
+    times = sorted(s["seconds"] * 1e3 for s in samples)
+    median = times[len(times) // 2]
+    print("import Qwiic_SCMD_CP: median %.2f ms, min %.2f ms, max %.2f ms" % (median, times[0], times[-1]))
+
+    status = 0
+    if any(s["board"] or s["busio"] for s in samples):
+        print("FAIL: import pulled in board/busio", file=sys.stderr)
+        status = 1
+    if args.budget_ms is not None and median > args.budget_ms:
+        print("FAIL: median above %.2f ms budget" % args.budget_ms, file=sys.stderr)
+        status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
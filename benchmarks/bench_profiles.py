@@ -0,0 +1,51 @@
+#-----------------------------------------------------------------------------
+# Bus cost of a speed ramp: naive set_drive loop vs a precomputed profile.
+#-----------------------------------------------------------------------------
+#
+# Two motors ramp 0 -> 255 -> 0 in opposite directions. The naive loop
+# writes both motors on every step, like the examples; the profile writes
+# only when a drive byte changes. Runs on the simulated bus's model clock,
+# so it takes no wall time.
+#
+#   python bench_profiles.py [--rate HZ] [--ramp-time S]
+#
+
+import argparse
+import sys
+
+from Qwiic_SCMD_CP import QwiicScmd
+from Qwiic_SCMD_CP.profiles import MotionProfile, trapezoid, LINEAR, S_CURVE
+from Qwiic_SCMD_CP.simulated_i2c import SimulatedI2C
+
+
+def naive(motor, bus, speeds, rate):
+    for speed in speeds:
+        motor.set_drive(0, 0, speed)
+        motor.set_drive(1, 1, speed)
+        bus.advance(1.0 / rate)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Speed ramp bus cost")
+    parser.add_argument("--rate", type=float, default=1000.0, help="profile steps per second")
+    parser.add_argument("--ramp-time", type=float, default=1.0)
+    parser.add_argument("--overhead-us", type=float, default=50.0)
+    args = parser.parse_args(argv)
+
+    print("%-20s %8s %8s %10s" % ("strategy", "steps", "txns", "bus ms"))
+    for curve in (LINEAR, S_CURVE):
+        speeds = trapezoid(255, args.ramp_time, 0, args.rate, curve)
+
+        bus = SimulatedI2C(transaction_overhead=args.overhead_us * 1e-6)
+        naive(QwiicScmd(i2c_driver=bus), bus, speeds, args.rate)
+        print("%-20s %8d %8d %10.1f" % ("naive " + curve, len(speeds), bus.transactions, bus.bus_time * 1e3))
+
+        bus = SimulatedI2C(transaction_overhead=args.overhead_us * 1e-6)
+        profile = MotionProfile(args.rate).add(0, speeds).add(1, [-s for s in speeds])
+        profile.play(QwiicScmd(i2c_driver=bus), clock=bus.now, sleep=bus.advance)
+        print("%-20s %8d %8d %10.1f" % ("profile " + curve, len(speeds), bus.transactions, bus.bus_time * 1e3))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+#-----------------------------------------------------------------------------
+# Drive update throughput on a noisy bus, with and without RetryingI2C.
+#-----------------------------------------------------------------------------
+#
+# The simulated bus fails transactions at random with the given error rate.
+# A loop sends set_drives() for two motors; a call that raises counts as a
+# failed update. Runs on the simulated bus's model clock, so retry backoff
+# is charged as bus time and the figures do not depend on host speed.
+#
+#   python bench_retry.py [--updates N] [--rates 0,0.001,0.01,0.05,0.2]
+#
+
+import argparse
+import sys
+
+from Qwiic_SCMD_CP import QwiicScmd
+from Qwiic_SCMD_CP.simulated_i2c import SimulatedI2C
+from Qwiic_SCMD_CP.transport import RetryingI2C
+
+
+def run(rate, updates, retrying, budget, overhead):
+    bus = SimulatedI2C(transaction_overhead=overhead, error_rate=rate, seed=1)
+    i2c = RetryingI2C(bus, budget=budget, clock=bus.now, sleep=bus.advance) if retrying else bus
+    motor = QwiicScmd(i2c_driver=i2c)
+    bus.reset_stats()
+    failed = 0
+    worst = 0.0
+    for i in range(updates):
+        start = bus.now()
+        try:
+            motor.set_drives({0: (0, i % 256), 1: (1, i % 256)})
+        except OSError:
+            failed += 1
+        worst = max(worst, bus.now() - start)
+    elapsed = bus.now()
+    retries = i2c.retries if retrying else 0
+    return updates - failed, failed, retries, worst, (updates - failed) / elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Throughput under injected bus errors")
+    parser.add_argument("--updates", type=int, default=10000)
+    parser.add_argument("--rates", default="0,0.001,0.01,0.05,0.2", help="comma separated error rates")
+    parser.add_argument("--budget-us", type=float, default=2000.0, help="RetryingI2C time budget per call")
+    parser.add_argument("--overhead-us", type=float, default=50.0)
+    args = parser.parse_args(argv)
+
+    print("%-8s %-10s %8s %8s %8s %10s %10s" % ("errors", "transport", "ok", "failed", "retries",
+                                               "worst us", "updates/s"))
+    for rate in (float(r) for r in args.rates.split(",")):
+        for retrying in (False, True):
+            ok, failed, retries, worst, throughput = run(rate, args.updates, retrying,
+                                                         args.budget_us * 1e-6, args.overhead_us * 1e-6)
+            print("%-8g %-10s %8d %8d %8d %10.0f %10.0f" % (rate, "retrying" if retrying else "raw",
+                                                           ok, failed, retries, worst * 1e6, throughput))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
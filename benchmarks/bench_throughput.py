@@ -0,0 +1,85 @@
+#-----------------------------------------------------------------------------
+# Motor update rate per bus clock and batching strategy.
+#-----------------------------------------------------------------------------
+#
+# For every I2C clock, batching strategy and motor count, one full update
+# (every motor gets a new drive value) is timed on the simulated bus's
+# timing model. Reported: modeled bus time per update, the update rate one
+# board can sustain, motor updates per second, and how many such boards one
+# bus carries at --loop-hz.
+#
+# Strategies:
+#   set_drive     one transaction per motor, as in the examples
+#   set_drives    one packed write per board
+#   suppressed    set_drives with redundant-write suppression, --change of
+#                 the motors changing per update
+#
+#   python bench_throughput.py [--frequencies 100000,400000,1000000]
+#                              [--motors 2,8,34] [--loop-hz 100] [--change 0.25]
+#
+
+import argparse
+import sys
+
+from Qwiic_SCMD_CP import QwiicScmd
+from Qwiic_SCMD_CP.simulated_i2c import SimulatedI2C, SimulatedSCMD
+
+
+def _levels(update, motors, change):
+    # drive levels for one update: each motor gets a new value every
+    # 1 / change updates, the motors taking turns
+    period = max(1, int(round(1.0 / change)))
+    return {n: (0, (update - (update - n) % period) % 256) for n in range(motors)}
+
+
+def _set_drive(motor, drives):
+    for motor_num, (direction, level) in drives.items():
+        motor.set_drive(motor_num, direction, level)
+
+
+STRATEGIES = [
+    ("set_drive", False, 1.0, _set_drive),
+    ("set_drives", False, 1.0, QwiicScmd.set_drives),
+    ("suppressed", True, None, QwiicScmd.set_drives),
+]
+
+
+def update_time(frequency, overhead, motors, suppress, change, write, updates):
+    slaves = max(0, (motors - 1) // 2)
+    bus = SimulatedI2C({0x5D: SimulatedSCMD(slaves=slaves)}, frequency=frequency,
+                       transaction_overhead=overhead)
+    motor = QwiicScmd(i2c_driver=bus, suppress_redundant_writes=suppress, refresh_interval=1e9)
+    write(motor, _levels(0, motors, change))
+    bus.reset_stats()
+    for update in range(1, updates + 1):
+        write(motor, _levels(update, motors, change))
+    return bus.bus_time / updates, bus.transactions / updates
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Motor update rate per bus configuration")
+    parser.add_argument("--frequencies", default="100000,400000,1000000", help="comma separated, Hz")
+    parser.add_argument("--motors", default="2,8,34", help="comma separated motor counts per board")
+    parser.add_argument("--overhead-us", type=float, default=50.0, help="host latency per transaction")
+    parser.add_argument("--loop-hz", type=float, default=100.0, help="control loop rate for the boards column")
+    parser.add_argument("--change", type=float, default=0.25, help="share of motors changing per update (suppressed)")
+    parser.add_argument("--updates", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    print("%-9s %-11s %6s %7s %9s %10s %12s %7s" % ("kHz", "strategy", "motors", "txns", "us/update",
+                                                   "updates/s", "motor upd/s", "boards"))
+    for frequency in (int(f) for f in args.frequencies.split(",")):
+        for motors in (int(m) for m in args.motors.split(",")):
+            for name, suppress, change, write in STRATEGIES:
+                seconds, transactions = update_time(frequency, args.overhead_us * 1e-6, motors, suppress,
+                                                    args.change if change is None else change, write,
+                                                    args.updates)
+                rate = 1.0 / seconds
+                print("%-9g %-11s %6d %7.1f %9.0f %10.0f %12.0f %7d" % (
+                    frequency / 1e3, name, motors, transactions, seconds * 1e6, rate, rate * motors,
+                    int(rate // args.loop_hz)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
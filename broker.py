@@ -0,0 +1,462 @@
+# I2C bus broker: one process owns the bus, others use it over a Unix socket
+#
+# BusBroker holds the busio.I2C (or SimulatedI2C) handle and executes the
+# transactions its clients send. BrokerI2C is the client side; it has the
+# busio.I2C interface, so QwiicScmd(i2c_driver=BrokerI2C(path)) works
+# unchanged in any number of processes.
+#
+# Writes that only touch the motor drive registers are not executed right
+# away. The broker collects them for one tick, merges them per device (the
+# last value written to a register wins) and writes each device's drive
+# registers with as few auto-incrementing transactions as possible. Every
+# other request flushes the collected writes first and then runs on its
+# own, in arrival order.
+#
+# Host only (sockets and threads); run the broker with
+#
+#   python -m Qwiic_SCMD_CP.broker /tmp/scmd.sock [--simulate]
+#
+
+import argparse
+import errno
+import os
+import queue
+import socket
+import struct
+import sys
+import threading
+import time
+
+from . import QwiicScmd, _write_packed
+
+# request: op, device address, bytes to write, bytes to read; then the bytes to write
+_REQUEST = struct.Struct("<BBHH")
+# reply: 0 or an errno, payload length; then the bytes read
+_REPLY = struct.Struct("<HH")
+
+OP_WRITE = 1
+OP_READ = 2
+OP_WRITE_READ = 3
+OP_SCAN = 4
+OP_HOLD = 5
+OP_RELEASE = 6
+
+# writes inside this register range are merged across clients
+_COALESCE_FIRST = QwiicScmd.SCMD_MA_DRIVE
+_COALESCE_LAST = QwiicScmd.SCMD_MA_DRIVE + 33
+
+# errno reported for failures that are not OSErrors
+_EIO = errno.EIO
+
+
+def _receive(sock, count):
+    data = bytearray()
+    while len(data) < count:
+        chunk = sock.recv(count - len(data))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        data += chunk
+    return data
+
+
+class _Request:
+    # one client request, waiting for the bus thread to answer it
+
+    def __init__(self, client, op, address, data, read_length):
+        self.client = client
+        self.op = op
+        self.address = address
+        self.data = data
+        self.read_length = read_length
+        self.status = 0
+        self.result = b""
+        self.done = threading.Event()
+
+    def finish(self, status=0, result=b""):
+        self.status = status
+        self.result = result
+        self.done.set()
+
+
+class BusBroker:
+    """
+        Serve one I2C bus to clients on a Unix socket
+
+        :param i2c: the bus, busio.I2C or compatible; the broker keeps its
+            lock for as long as it runs
+        :param path: Unix socket path
+        :param tick: seconds drive writes are collected before they are
+            flushed; 0 flushes whenever no other request is waiting
+
+    """
+
+    def __init__(self, i2c, path, tick=0.001):
+        self.i2c = i2c
+        self.path = path
+        self.tick = tick
+        self._queue = queue.Queue()
+        # address -> {register: value} of drive writes not yet on the bus
+        self._pending = {}
+        self._waiting = []
+        self._deferred = []
+        self._holder = None
+        self._server = None
+        self._threads = []
+        self._running = False
+        self._buffer = bytearray(_COALESCE_LAST - _COALESCE_FIRST + 2)
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.requests = 0
+        self.coalesced_writes = 0
+        self.flushes = 0
+        self.transactions = 0
+
+    def stats(self):
+        """
+            :return: requests (from all clients), coalesced_writes (drive
+                writes merged into a flush), flushes and transactions
+                (issued on the bus)
+            :rtype: dict
+
+        """
+        return {
+            "requests": self.requests,
+            "coalesced_writes": self.coalesced_writes,
+            "flushes": self.flushes,
+            "transactions": self.transactions,
+        }
+
+    # start( ... )
+    #
+    #     Listen on the socket and serve from background threads
+    #
+    def start(self):
+        """
+            Take the bus lock, bind the socket and start serving in
+            background threads
+
+            :return: self
+
+        """
+        while not self.i2c.try_lock():
+            time.sleep(0.001)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self.path)
+        self._server.listen()
+        self._running = True
+        for target in (self._accept, self._bus_loop):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        """
+            Stop serving, close the socket and give the bus lock back
+
+            :return: No return value
+
+        """
+        if not self._running:
+            return
+        self._running = False
+        self._queue.put(None)
+        try:
+            # wakes the accept() in the listener thread
+            self._server.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._server.close()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.i2c.unlock()
+
+    def serve_forever(self):
+        self.start()
+        try:
+            while self._running:
+                time.sleep(1.0)
+        finally:
+            self.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    # connection side
+
+    def _accept(self):
+        while self._running:
+            try:
+                sock, _ = self._server.accept()
+            except OSError:
+                return
+            thread = threading.Thread(target=self._serve_client, args=(sock,), daemon=True)
+            thread.start()
+
+    def _serve_client(self, sock):
+        client = object()
+        try:
+            while True:
+                op, address, write_length, read_length = _REQUEST.unpack(_receive(sock, _REQUEST.size))
+                data = bytes(_receive(sock, write_length)) if write_length else b""
+                request = _Request(client, op, address, data, read_length)
+                self._queue.put(request)
+                request.done.wait()
+                sock.sendall(_REPLY.pack(request.status, len(request.result)) + request.result)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            sock.close()
+            # a client that disappears while holding the bus releases it
+            self._queue.put(_Request(client, OP_RELEASE, 0, b"", 0))
+
+    # bus side: everything below runs on the bus thread only
+
+    def _bus_loop(self):
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                request = self._queue.get(timeout=timeout) if timeout != 0.0 else self._queue.get_nowait()
+            except queue.Empty:
+                self._flush()
+                deadline = None
+                continue
+            if request is None:
+                self._flush()
+                return
+            self._handle(request)
+            if self._pending and deadline is None:
+                deadline = time.monotonic() + self.tick
+
+    def _coalescable(self, request):
+        if request.op != OP_WRITE or len(request.data) < 2:
+            return False
+        first = request.data[0]
+        return _COALESCE_FIRST <= first and first + len(request.data) - 2 <= _COALESCE_LAST
+
+    def _handle(self, request):
+        if request.op != OP_RELEASE:
+            self.requests += 1
+        if self._holder is not None and request.client is not self._holder:
+            if request.op == OP_RELEASE:
+                request.done.set()
+            else:
+                self._deferred.append(request)
+            return
+        if self._coalescable(request):
+            pending = self._pending.setdefault(request.address, {})
+            first = request.data[0]
+            for i, value in enumerate(request.data[1:]):
+                pending[first + i] = value
+            self.coalesced_writes += 1
+            self._waiting.append(request)
+            return
+        self._flush()
+        if request.op == OP_HOLD:
+            self._holder = request.client
+            request.finish()
+        elif request.op == OP_RELEASE:
+            self._holder = None
+            request.finish()
+            deferred = self._deferred
+            self._deferred = []
+            for waiting in deferred:
+                self.requests -= 1
+                self._handle(waiting)
+        else:
+            self._execute(request)
+
+    def _execute(self, request):
+        try:
+            if request.op == OP_WRITE:
+                self.transactions += 1
+                self.i2c.writeto(request.address, request.data)
+                request.finish()
+            elif request.op == OP_READ:
+                buffer = bytearray(request.read_length)
+                self.transactions += 1
+                self.i2c.readfrom_into(request.address, buffer)
+                request.finish(0, bytes(buffer))
+            elif request.op == OP_WRITE_READ:
+                buffer = bytearray(request.read_length)
+                self.transactions += 1
+                self.i2c.writeto_then_readfrom(request.address, request.data, buffer)
+                request.finish(0, bytes(buffer))
+            elif request.op == OP_SCAN:
+                found = self.i2c.scan()
+                request.finish(0, bytes(found))
+            else:
+                request.finish(errno.EINVAL)
+        except OSError as e:
+            request.finish(e.errno or _EIO)
+        except Exception:
+            request.finish(_EIO)
+
+    def _flush(self):
+        # write the collected drive registers, then answer their requests
+        if not self._waiting:
+            return
+        pending = self._pending
+        waiting = self._waiting
+        self._pending = {}
+        self._waiting = []
+        self.flushes += 1
+        failed = {}
+        for address, registers in pending.items():
+            try:
+                self.transactions += _write_packed(self.i2c, address, self._buffer, registers)
+            except OSError as e:
+                failed[address] = e.errno or _EIO
+            except Exception:
+                failed[address] = _EIO
+        for request in waiting:
+            request.finish(failed.get(request.address, 0))
+
+
+class BrokerI2C:
+    """
+        busio.I2C compatible client of a BusBroker
+
+        try_lock()/unlock() serialize the threads of this process; the
+        broker serializes the processes. A QwiicScmd on this bus turns its
+        configuration shadow off (see shared) and runs every
+        read-modify-write and page selection with its paged access under
+        hold(). Use hold() around longer sequences of your own that must not
+        interleave with other clients.
+
+        :param path: Unix socket path of the broker
+
+    """
+
+    # other processes write the same devices, so what this process last
+    # wrote or read may be stale; QwiicScmd reads this
+    shared = True
+
+    def __init__(self, path):
+        self.path = path
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.connect(path)
+        self._lock = threading.Lock()
+        # one request in flight per connection
+        self._io_lock = threading.Lock()
+        # nesting depth of hold(); only the outermost talks to the broker
+        self._holds = 0
+        self._hold_lock = threading.Lock()
+
+    def _request(self, op, address, data=b"", read_length=0):
+        with self._io_lock:
+            self._sock.sendall(_REQUEST.pack(op, address, len(data), read_length) + data)
+            status, length = _REPLY.unpack(_receive(self._sock, _REPLY.size))
+            result = _receive(self._sock, length) if length else b""
+        if status:
+            raise OSError(status, os.strerror(status))
+        return result
+
+    # busio.I2C interface
+
+    def try_lock(self):
+        return self._lock.acquire(False)
+
+    def unlock(self):
+        self._lock.release()
+
+    def writeto(self, address, buffer, *, start=0, end=None):
+        self._request(OP_WRITE, address, bytes(buffer[start:end]))
+
+    def readfrom_into(self, address, buffer, *, start=0, end=None):
+        end = len(buffer) if end is None else end
+        buffer[start:end] = self._request(OP_READ, address, b"", end - start)
+
+    def writeto_then_readfrom(self, address, buffer_out, buffer_in, *, out_start=0,
+                              out_end=None, in_start=0, in_end=None):
+        in_end = len(buffer_in) if in_end is None else in_end
+        buffer_in[in_start:in_end] = self._request(OP_WRITE_READ, address,
+                                                   bytes(buffer_out[out_start:out_end]),
+                                                   in_end - in_start)
+
+    def readfrom(self, address, nbytes):
+        return bytes(self._request(OP_READ, address, b"", nbytes))
+
+    def scan(self):
+        return list(self._request(OP_SCAN, 0))
+
+    def deinit(self):
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.deinit()
+
+    # hold( ... )
+    #
+    #     Keep other clients off the bus for a sequence of transactions
+    #
+    def hold(self):
+        """
+            Context manager: while inside, the broker serves only this
+            client; other clients' requests wait until it is left. Holds
+            nest.
+
+            :return: context manager
+
+        """
+        return _Hold(self)
+
+
+class _Hold:
+
+    def __init__(self, client):
+        self._client = client
+
+    def __enter__(self):
+        client = self._client
+        with client._hold_lock:
+            if not client._holds:
+                client._request(OP_HOLD, 0)
+            client._holds += 1
+        return client
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        client = self._client
+        with client._hold_lock:
+            client._holds -= 1
+            if not client._holds:
+                client._request(OP_RELEASE, 0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Share one I2C bus over a Unix socket")
+    parser.add_argument("path", help="Unix socket path")
+    parser.add_argument("--tick", type=float, default=0.001, help="seconds to collect drive writes")
+    parser.add_argument("--frequency", type=int, default=None, help="I2C clock in Hz")
+    parser.add_argument("--simulate", action="store_true", help="serve a SimulatedI2C instead")
+    args = parser.parse_args(argv)
+
+    if args.simulate:
+        from .simulated_i2c import SimulatedI2C
+        i2c = SimulatedI2C(realtime=True)
+    else:
+        import board
+        import busio
+        if args.frequency is None:
+            i2c = busio.I2C(board.SCL, board.SDA)
+        else:
+            i2c = busio.I2C(board.SCL, board.SDA, frequency=args.frequency)
+    BusBroker(i2c, args.path, tick=args.tick).serve_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+# Common base of the busio.I2C wrappers in this package
+#
+# BusProxy forwards the busio.I2C interface to the bus it wraps; a wrapper
+# (transport.RetryingI2C, bus_trace.TraceRecorder, the instrumentation
+# counter) overrides only the transactions it acts on. Anything else, such as
+# frequency or deinit(), falls through to the wrapped bus.
+
+
+def _span(buffer, start, end):
+    # bytes between start and end (None: the end of buffer)
+    return (len(buffer) if end is None else end) - start
+
+
+class BusProxy:
+    """
+        busio.I2C compatible bus that forwards every call to another bus
+
+        :param i2c: the bus to wrap
+
+    """
+
+    def __init__(self, i2c):
+        self.i2c = i2c
+
+    @property
+    def wrapped_bus(self):
+        """
+            The bus at the end of a chain of proxies, which is what the
+            transactions really go to
+
+            :rtype: busio.I2C or compatible
+
+        """
+        bus = self.i2c
+        return bus.wrapped_bus if isinstance(bus, BusProxy) else bus
+
+    def __getattr__(self, name):
+        return getattr(self.i2c, name)
+
+    def try_lock(self):
+        return self.i2c.try_lock()
+
+    def unlock(self):
+        self.i2c.unlock()
+
+    def writeto(self, address, buffer, *, start=0, end=None):
+        self.i2c.writeto(address, buffer, start=start, end=end)
+
+    def readfrom_into(self, address, buffer, *, start=0, end=None):
+        self.i2c.readfrom_into(address, buffer, start=start, end=end)
+
+    def writeto_then_readfrom(self, address, buffer_out, buffer_in, *, out_start=0,
+                              out_end=None, in_start=0, in_end=None):
+        self.i2c.writeto_then_readfrom(address, buffer_out, buffer_in, out_start=out_start,
+                                       out_end=out_end, in_start=in_start, in_end=in_end)
+
+    def readfrom(self, address, nbytes):
+        return self.i2c.readfrom(address, nbytes)
+
+    def scan(self):
+        return self.i2c.scan()
@@ -0,0 +1,234 @@
+# Binary recording and replay of I2C traffic
+#
+# TraceRecorder wraps the bus passed to QwiicScmd(i2c_driver=...) and
+# appends every transaction to a file. replay() feeds a recording back into
+# another bus, typically a SimulatedI2C, so driver changes can be compared
+# against identical traffic.
+#
+# File format: the 8 byte magic b"SCMDTRC1", then one record per
+# transaction. A record is a little-endian header
+#
+#     uint32 microseconds since the previous record (saturating)
+#     uint8  7-bit address
+#     uint8  kind (WRITE, READ, WRITE_READ, SCAN), | ERROR if it raised
+#     uint16 bytes written
+#     uint16 bytes read
+#
+# followed by the bytes written and then the bytes read. A record with
+# ERROR set keeps the requested read length in its header but carries no
+# read bytes. Records are self-delimiting, so a file can be read while it is still being written
+# and never has to fit in memory. A recorder appends to an existing trace
+# without repeating the magic; a magic found between records (traces joined
+# by other means) is skipped and the stream carries on.
+
+from collections import namedtuple
+import struct
+import time
+
+from .bus_proxy import BusProxy, _span
+
+MAGIC = b"SCMDTRC1"
+
+WRITE = 1
+READ = 2
+WRITE_READ = 3
+SCAN = 4
+ERROR = 0x80
+
+_HEADER = struct.Struct("<IBBHH")
+_MAX_DELTA = 0xFFFFFFFF
+
+TraceRecord = namedtuple("TraceRecord", "time address kind written read error read_length")
+
+
+class TraceRecorder(BusProxy):
+    """
+        busio.I2C compatible wrapper that records every transaction
+
+        :param i2c: the bus to wrap
+        :param file: path, appended to if it exists, or binary file object
+            opened for writing/appending; the magic is written only when the
+            file is empty
+        :param flush_every: records between flushes of the file buffer
+
+    """
+
+    def __init__(self, i2c, file, flush_every=256):
+        super().__init__(i2c)
+        self._owns_file = isinstance(file, str)
+        self._file = open(file, "ab") if self._owns_file else file
+        try:
+            empty = self._file.tell() == 0
+        except OSError:
+            # a pipe or socket: the trace starts here
+            empty = True
+        if empty:
+            self._file.write(MAGIC)
+        self._flush_every = flush_every
+        self._pending = 0
+        self._last = time.monotonic()
+        self.records = 0
+
+    def _record(self, kind, address, written=b"", read=b"", read_length=None):
+        # read_length: bytes requested by a failed read, which returned none
+        now = time.monotonic()
+        delta = min(int((now - self._last) * 1e6), _MAX_DELTA)
+        self._last = now
+        if read_length is None:
+            read_length = len(read)
+        self._file.write(_HEADER.pack(delta, address, kind, len(written), read_length))
+        self._file.write(written)
+        self._file.write(read)
+        self.records += 1
+        self._pending += 1
+        if self._pending >= self._flush_every:
+            self._file.flush()
+            self._pending = 0
+
+    def writeto(self, address, buffer, *, start=0, end=None):
+        data = bytes(memoryview(buffer)[start:end])
+        try:
+            self.i2c.writeto(address, buffer, start=start, end=end)
+        except OSError:
+            self._record(WRITE | ERROR, address, data)
+            raise
+        self._record(WRITE, address, data)
+
+    def readfrom_into(self, address, buffer, *, start=0, end=None):
+        try:
+            self.i2c.readfrom_into(address, buffer, start=start, end=end)
+        except OSError:
+            self._record(READ | ERROR, address, read_length=_span(buffer, start, end))
+            raise
+        self._record(READ, address, read=bytes(memoryview(buffer)[start:end]))
+
+    def writeto_then_readfrom(self, address, buffer_out, buffer_in, *, out_start=0,
+                              out_end=None, in_start=0, in_end=None):
+        data = bytes(memoryview(buffer_out)[out_start:out_end])
+        try:
+            self.i2c.writeto_then_readfrom(address, buffer_out, buffer_in, out_start=out_start,
+                                           out_end=out_end, in_start=in_start, in_end=in_end)
+        except OSError:
+            self._record(WRITE_READ | ERROR, address, data,
+                         read_length=_span(buffer_in, in_start, in_end))
+            raise
+        self._record(WRITE_READ, address, data, bytes(memoryview(buffer_in)[in_start:in_end]))
+
+    def readfrom(self, address, nbytes):
+        buffer = bytearray(nbytes)
+        self.readfrom_into(address, buffer)
+        return bytes(buffer)
+
+    def scan(self):
+        found = self.i2c.scan()
+        self._record(SCAN, 0, read=bytes(found))
+        return found
+
+    def close(self):
+        """
+            Flush the trace, and close the file if it was opened from a path
+
+            :return: No return value
+
+        """
+        if self._file is None:
+            return
+        self._file.flush()
+        if self._owns_file:
+            self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_trace(file):
+    """
+        Stream the records of a trace
+
+        A truncated final record (file still being written) ends the stream.
+        A magic between records continues it.
+
+        :param file: path or binary file object
+
+        :return: generator of TraceRecord; time is seconds since the first
+            record, read_length the bytes requested (read is empty for a
+            failed transaction)
+        :raises ValueError: if the file is not a trace
+
+    """
+    f = open(file, "rb") if isinstance(file, str) else file
+    try:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("not an SCMD trace")
+        elapsed = None
+        while True:
+            header = f.read(_HEADER.size)
+            while header[:len(MAGIC)] == MAGIC:
+                # continuation marker; no record kind shares its bytes
+                header = header[len(MAGIC):] + f.read(len(MAGIC))
+            if len(header) < _HEADER.size:
+                return
+            delta, address, kind, n_written, n_read = _HEADER.unpack(header)
+            # a failed transaction records the length it asked for, no data
+            n_payload = n_written + (0 if kind & ERROR else n_read)
+            payload = f.read(n_payload)
+            if len(payload) < n_payload:
+                return
+            elapsed = 0.0 if elapsed is None else elapsed + delta / 1e6
+            yield TraceRecord(elapsed, address, kind & ~ERROR, payload[:n_written],
+                              payload[n_written:], bool(kind & ERROR), n_read)
+    finally:
+        if f is not file:
+            f.close()
+
+
+def replay(file, i2c, realtime=False, speed=1.0):
+    """
+        Issue the transactions of a trace on another bus
+
+        Recorded failures are replayed too; reads are compared with the
+        recording.
+
+        :param file: path or binary file object of the trace
+        :param i2c: bus to replay on, e.g. SimulatedI2C
+        :param realtime: keep the recorded spacing between transactions
+        :param speed: time scale when realtime (2.0 is twice as fast)
+
+        :return: records, errors (transactions that raised) and mismatches
+            (reads that returned different data than recorded)
+        :rtype: dict
+
+    """
+    stats = {"records": 0, "errors": 0, "mismatches": 0}
+    while not i2c.try_lock():
+        time.sleep(0.001)
+    try:
+        start = time.monotonic()
+        for record in read_trace(file):
+            if realtime:
+                delay = start + record.time / speed - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            stats["records"] += 1
+            buffer = bytearray(record.read_length)
+            try:
+                if record.kind == WRITE:
+                    i2c.writeto(record.address, record.written)
+                elif record.kind == READ:
+                    i2c.readfrom_into(record.address, buffer)
+                elif record.kind == WRITE_READ:
+                    i2c.writeto_then_readfrom(record.address, record.written, buffer)
+                elif record.kind == SCAN:
+                    buffer = bytes(i2c.scan())
+            except OSError:
+                stats["errors"] += 1
+                continue
+            if bytes(buffer) != record.read and not record.error:
+                stats["mismatches"] += 1
+    finally:
+        i2c.unlock()
+    return stats
@@ -0,0 +1,181 @@
+# Streaming diagnostics monitor for QwiicScmd
+#
+# Samples the raw diagnostic registers into a fixed-size ring buffer backed
+# by flat arrays, so a long run keeps constant memory and keeps no object
+# per sample. The error counters on the SCMD are 8 bits and wrap; deltas are
+# taken modulo 256, which is exact as long as fewer than 256 errors of one
+# kind happen between two samples.
+#
+# Uses no threads, so it runs on CircuitPython as well.
+
+from array import array
+import time
+
+from . import QwiicScmd
+
+# counters tracked in deltas and totals, in this order
+ERROR_COUNTERS = (
+    "U_I2C_RD_ERR",
+    "U_I2C_WR_ERR",
+    "U_BUF_DUMPED",
+    "E_I2C_RD_ERR",
+    "E_I2C_WR_ERR",
+    "MST_E_ERR",
+    "FSAFE_FAULTS",
+    "REG_OOR_CNT",
+    "REG_RO_WRITE_CNT",
+)
+
+
+def _offset(name):
+    # position of a diagnostic register within one sample
+    return getattr(QwiicScmd, "SCMD_" + name) - QwiicScmd._DIAG_FIRST
+
+
+class DiagnosticsMonitor:
+    """
+        Ring buffer of diagnostic samples and running error-counter deltas
+
+        Each sample is the 13 raw bytes of U_I2C_RD_ERR..REG_RO_WRITE_CNT
+        plus a timestamp. Once capacity samples are stored the oldest are
+        overwritten.
+
+        :param motor: QwiicScmd
+        :param capacity: samples kept
+        :param clock: time source in seconds
+
+    """
+
+    def __init__(self, motor, capacity=256, clock=time.monotonic):
+        self.motor = motor
+        self.capacity = capacity
+        self.clock = clock
+        self._width = QwiicScmd._DIAG_LENGTH
+        self._samples = bytearray(capacity * self._width)
+        self._times = array("d", [0.0]) * capacity
+        self._offsets = bytes(_offset(name) for name in ERROR_COUNTERS)
+        # deltas of the latest sample and totals since the first, in ERROR_COUNTERS order
+        self.deltas = array("H", [0]) * len(ERROR_COUNTERS)
+        self.totals = array("L", [0]) * len(ERROR_COUNTERS)
+        self.count = 0
+        # ring slots of the latest sample and the next one
+        self._latest = 0
+        self._next = 0
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def _slot(self, age):
+        # ring index of the sample age steps back from the latest
+        if age >= len(self):
+            raise IndexError("sample not in the ring buffer")
+        return (self._latest - age) % self.capacity
+
+    # sample( ... )
+    #
+    #     Read the counters once and update deltas and totals
+    #
+    def sample(self):
+        """
+            Read the diagnostic registers into the next ring slot and update
+            deltas and totals
+
+            :return: True if any error counter moved since the previous sample
+            :rtype: bool
+
+        """
+        width = self._width
+        slot = self._next
+        start = slot * width
+        self.motor.read_diagnostics_into(self._samples, start)
+        self._times[slot] = self.clock()
+        samples = self._samples
+        offsets = self._offsets
+        deltas = self.deltas
+        totals = self.totals
+        changed = False
+        if self.count:
+            previous = self._latest * width
+            i = 0
+            while i < len(offsets):
+                offset = offsets[i]
+                delta = (samples[start + offset] - samples[previous + offset]) & 0xFF
+                deltas[i] = delta
+                if delta:
+                    totals[i] += delta
+                    changed = True
+                i += 1
+        self._latest = slot
+        self._next = slot + 1 if slot + 1 < self.capacity else 0
+        self.count += 1
+        return changed
+
+    def value(self, name, age=0):
+        """
+            A counter as read age samples ago
+
+            :param name: register name without SCMD_, e.g. "FSAFE_FAULTS"
+            :param age: 0 for the latest sample
+
+            :rtype: integer
+
+        """
+        return self._samples[self._slot(age) * self._width + _offset(name)]
+
+    def timestamp(self, age=0):
+        return self._times[self._slot(age)]
+
+    def history(self, name):
+        """
+            Every stored value of a counter, oldest first
+
+            :param name: register name without SCMD_
+
+            :rtype: bytearray
+
+        """
+        offset = _offset(name)
+        return bytearray(self._samples[self._slot(age) * self._width + offset]
+                         for age in range(len(self) - 1, -1, -1))
+
+    def reset(self):
+        self.count = 0
+        self._latest = 0
+        self._next = 0
+        for i in range(len(ERROR_COUNTERS)):
+            self.deltas[i] = 0
+            self.totals[i] = 0
+
+    # stream( ... )
+    #
+    #     Generator of error-counter deltas at a fixed interval
+    #
+    #   interval -- seconds between samples
+    #   count -- number of samples, None for no limit
+    def stream(self, interval, count=None, changes_only=False, sleep=time.sleep):
+        """
+            Sample every interval seconds (start to start) and yield the
+            deltas of the error counters
+
+            The yielded array is self.deltas, reused for every sample: read
+            it or copy it before advancing the generator.
+
+            :param interval: seconds between samples
+            :param count: number of samples, None for no limit
+            :param changes_only: yield only samples where some counter moved
+            :param sleep: function that waits a number of seconds
+
+            :return: generator of (timestamp, deltas in ERROR_COUNTERS order)
+
+        """
+        next_time = self.clock()
+        taken = 0
+        while count is None or taken < count:
+            changed = self.sample()
+            taken += 1
+            if changed or not changes_only:
+                yield self.timestamp(), self.deltas
+            next_time += interval
+            delay = next_time - self.clock()
+            if delay > 0:
+                sleep(delay)
@@ -0,0 +1,160 @@
+# Several SCMD boards on one or more I2C buses, driven as one motor array
+#
+# Motors are numbered globally in discovery order: bus by bus, and on each
+# bus in the order of the addresses list (by default
+# QwiicScmd.available_addresses, 0x5D first), not by address value. Updates are split per bus and per board; each bus has its own
+# worker thread, so boards on different buses are written in parallel while
+# writes on one bus stay serialized and batched per board.
+
+from concurrent.futures import ThreadPoolExecutor
+
+from . import QwiicScmd
+
+
+class QwiicScmdFleet:
+    """
+        Boards found on the given buses, addressed by global motor number
+
+        :param buses: I2C buses (busio.I2C or compatible) to search
+        :param addresses: addresses to look for, in the order their motors
+            are numbered; default QwiicScmd.available_addresses
+        :param kwargs: passed on to every QwiicScmd
+
+    """
+
+    def __init__(self, buses, addresses=None, **kwargs):
+        self.buses = list(buses)
+        self.addresses = list(addresses) if addresses is not None else list(QwiicScmd.available_addresses)
+        self._driver_kwargs = kwargs
+        self.boards = []
+        # global motor number -> (board, local motor number)
+        self._motors = []
+        self._bus_of = {}
+        self._workers = {}
+        self.discover()
+
+    # discover( ... )
+    #
+    #     Find boards and number their motors
+    #
+    def discover(self):
+        """
+            Scan every bus once, create a QwiicScmd per board found and
+            renumber the motors; each board contributes 2 motors plus 2 per
+            enumerated expansion slave
+
+            :return: number of boards found
+            :rtype: integer
+
+        """
+        self.boards = []
+        self._motors = []
+        self._bus_of = {}
+        for bus_index, bus in enumerate(self.buses):
+            candidates = [QwiicScmd(address, bus, **self._driver_kwargs) for address in self.addresses]
+            # one fresh scan per bus; the other candidates reuse it
+            candidates[0].scan()
+            for board in candidates:
+                if not board.is_connected(max_age=float("inf")):
+                    continue
+                slaves = board.get_diagnostics().numberOfSlaves
+                self.boards.append(board)
+                self._bus_of[board] = bus_index
+                for motor_num in range(2 + 2 * slaves):
+                    self._motors.append((board, motor_num))
+        return len(self.boards)
+
+    @property
+    def motor_count(self):
+        return len(self._motors)
+
+    def motor(self, number):
+        """
+            Board and local motor number of a global motor number
+
+            :param number: global motor number
+
+            :return: (QwiicScmd, motor_num)
+            :rtype: tuple
+
+        """
+        return self._motors[number]
+
+    def _worker(self, bus_index):
+        worker = self._workers.get(bus_index)
+        if worker is None:
+            worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scmd-bus%d" % bus_index)
+            self._workers[bus_index] = worker
+        return worker
+
+    def _dispatch(self, jobs):
+        # jobs: {board: callable}; run per bus, in parallel across buses
+        per_bus = {}
+        for board, job in jobs.items():
+            per_bus.setdefault(self._bus_of[board], []).append((board, job))
+
+        def run(batch):
+            for board, job in batch:
+                with board.session():
+                    job(board)
+
+        if len(per_bus) == 1:
+            for batch in per_bus.values():
+                run(batch)
+            return
+        futures = [self._worker(bus_index).submit(run, batch) for bus_index, batch in per_bus.items()]
+        errors = [f.exception() for f in futures]
+        for e in errors:
+            if e is not None:
+                raise e
+
+    # set_drives( ... )
+    #
+    #     Set motors anywhere in the fleet
+    #
+    #   drives -- dict of global motor number: (direction, level)
+    def set_drives(self, drives):
+        """
+            Set the drive of any number of motors across the fleet
+
+            Each board receives one set_drives() call; boards on different
+            buses are written in parallel. Returns after every write is done.
+
+            :param drives: dict of global motor number: (direction, level)
+
+            :return: No return value
+
+        """
+        per_board = {}
+        for number, drive in drives.items():
+            board, motor_num = self._motors[number]
+            per_board.setdefault(board, {})[motor_num] = drive
+        self._dispatch({board: (lambda b, d=board_drives: b.set_drives(d))
+                        for board, board_drives in per_board.items()})
+
+    def set_drive(self, number, direction, level):
+        board, motor_num = self._motors[number]
+        board.set_drive(motor_num, direction, level)
+
+    def enable(self):
+        self._dispatch({board: lambda b: b.enable() for board in self.boards})
+
+    def disable(self):
+        self._dispatch({board: lambda b: b.disable() for board in self.boards})
+
+    def close(self):
+        """
+            Stop the per-bus worker threads
+
+            :return: No return value
+
+        """
+        for worker in self._workers.values():
+            worker.shutdown()
+        self._workers = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,87 @@
+# Fail-safe heartbeat for QwiicScmd
+#
+# The SCMD stops every motor when no write reaches it within its fail-safe
+# time. Call Heartbeat.beat() once per pass of the control loop: it sends a
+# keepalive only when no drive or config write went out recently, so a loop
+# that is writing anyway adds no traffic. A loop that stalls stops calling
+# beat(), so the fail-safe still trips.
+#
+# Uses no threads, so it runs on CircuitPython as well.
+
+import time
+
+
+class Heartbeat:
+    """
+        Keep the SCMD fail-safe timer fed from a control loop
+
+        Any write the driver sent since the previous beat() counts as having
+        fed the timer at the previous beat (the earliest it could have gone
+        out). When that is at least interval seconds ago, beat() sends a
+        keepalive. Between beats the timer goes unfed for at most interval
+        plus one loop period, so keep the loop period under the fail-safe
+        time minus interval.
+
+        :param motor: QwiicScmd
+        :param timeout: fail-safe time in seconds; None reads it from the
+            SCMD (see QwiicScmd.set_fail_safe_time()). 0 means the
+            fail-safe is off and beat() never sends.
+        :param margin: fraction of timeout after which a keepalive is due
+        :param clock: time source in seconds
+
+    """
+
+    def __init__(self, motor, timeout=None, margin=0.5, clock=time.monotonic):
+        self.motor = motor
+        self.clock = clock
+        if timeout is None:
+            timeout = motor.get_fail_safe_time() / 1000.0
+        self.timeout = timeout
+        self.interval = timeout * margin
+        self.sent = 0
+        self.piggybacked = 0
+        motor._fed = False
+        self._fed_at = clock()
+        self._last_beat = self._fed_at
+
+    # beat( ... )
+    #
+    #     Feed the fail-safe timer if no write did
+    #
+    def beat(self):
+        """
+            Call once per loop pass; sends a keepalive only when needed
+
+            :return: True if a keepalive was sent
+            :rtype: bool
+
+        """
+        now = self.clock()
+        motor = self.motor
+        fed = motor._fed
+        if fed:
+            motor._fed = False
+            self._fed_at = self._last_beat
+        self._last_beat = now
+        if self.timeout and now - self._fed_at >= self.interval:
+            motor.keep_alive()
+            motor._fed = False
+            self._fed_at = now
+            self.sent += 1
+            return True
+        if fed:
+            self.piggybacked += 1
+        return False
+
+    def reset_stats(self):
+        self.sent = 0
+        self.piggybacked = 0
+
+    def stats(self):
+        """
+            :return: sent (keepalives written) and piggybacked (beats covered
+                by drive or config traffic)
+            :rtype: dict
+
+        """
+        return {"sent": self.sent, "piggybacked": self.piggybacked}
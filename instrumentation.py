@@ -0,0 +1,243 @@
+# Per-method I2C instrumentation for QwiicScmd
+#
+# Enabled with QwiicScmd.enable_instrumentation(). The driver's public
+# methods and lock acquisition are shadowed by timing wrappers on the
+# instance, and the bus is wrapped in a counting proxy. Disabling removes
+# the wrappers again, so an uninstrumented driver pays nothing.
+
+import time
+
+from . import _thread_local
+from .bus_proxy import BusProxy, _span
+
+# histogram bucket upper bounds in seconds; the last bucket is open-ended
+DEFAULT_BOUNDS = (10e-6, 20e-6, 50e-6, 100e-6, 200e-6, 500e-6,
+                  1e-3, 2e-3, 5e-3, 10e-3, 20e-3, 50e-3, 100e-3)
+
+# public methods that do no bus work of their own
+_NOT_WRAPPED = ("session", "write_counts", "enable_instrumentation", "disable_instrumentation")
+
+
+class Histogram:
+    """
+        Fixed-bucket histogram of durations
+
+        :param bounds: increasing bucket upper bounds in seconds; values above
+            the last bound go into an overflow bucket
+
+    """
+
+    def __init__(self, bounds=DEFAULT_BOUNDS):
+        self.bounds = tuple(bounds)
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        bounds = self.bounds
+        i = 0
+        while i < len(bounds) and value > bounds[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def snapshot(self):
+        """
+            :return: count, total, mean, max, bounds and counts per bucket
+            :rtype: dict
+
+        """
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "bounds": list(self.bounds),
+            "counts": list(self.counts),
+        }
+
+
+class MethodStats:
+    """ Counters of one driver method """
+
+    def __init__(self, bounds=DEFAULT_BOUNDS):
+        self.calls = 0
+        self.errors = 0
+        self.transactions = 0
+        self.bytes_written = 0
+        self.bytes_read = 0
+        self.latency = Histogram(bounds)
+        self.lock_wait = Histogram(bounds)
+
+    def snapshot(self):
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "transactions": self.transactions,
+            "bytes_written": self.bytes_written,
+            "bytes_read": self.bytes_read,
+            "latency": self.latency.snapshot(),
+            "lock_wait": self.lock_wait.snapshot(),
+        }
+
+
+class _CountingI2C(BusProxy):
+    # forwards to the real bus, charging transactions to the current method
+
+    def __init__(self, i2c, instrumentation):
+        super().__init__(i2c)
+        self._instrumentation = instrumentation
+
+    def writeto(self, address, buffer, *, start=0, end=None):
+        self._instrumentation._charge(_span(buffer, start, end), 0)
+        super().writeto(address, buffer, start=start, end=end)
+
+    def readfrom_into(self, address, buffer, *, start=0, end=None):
+        self._instrumentation._charge(0, _span(buffer, start, end))
+        super().readfrom_into(address, buffer, start=start, end=end)
+
+    def writeto_then_readfrom(self, address, buffer_out, buffer_in, *, out_start=0,
+                              out_end=None, in_start=0, in_end=None):
+        self._instrumentation._charge(_span(buffer_out, out_start, out_end),
+                                       _span(buffer_in, in_start, in_end))
+        super().writeto_then_readfrom(address, buffer_out, buffer_in, out_start=out_start,
+                                      out_end=out_end, in_start=in_start, in_end=in_end)
+
+    def readfrom(self, address, nbytes):
+        self._instrumentation._charge(0, nbytes)
+        return super().readfrom(address, nbytes)
+
+    def scan(self):
+        self._instrumentation._charge(0, 0)
+        return super().scan()
+
+
+class Instrumentation:
+    """
+        Transactions, bytes, lock wait and latency per QwiicScmd method
+
+        Work done outside any public method is charged to "(other)". Nested
+        public calls are charged to the innermost one; each thread keeps its
+        own call stack, so concurrent callers are charged separately.
+
+        :param bounds: histogram bucket bounds in seconds
+
+    """
+
+    def __init__(self, bounds=DEFAULT_BOUNDS):
+        self.bounds = bounds
+        self.methods = {}
+        # per thread: .stack, the names of the methods being run
+        self._calls = _thread_local()
+        self._motor = None
+        self._bus = None
+
+    def _stats(self, name):
+        stats = self.methods.get(name)
+        if stats is None:
+            stats = self.methods[name] = MethodStats(self.bounds)
+        return stats
+
+    def _stack(self):
+        calls = self._calls
+        stack = getattr(calls, "stack", None)
+        if stack is None:
+            stack = calls.stack = []
+        return stack
+
+    def _current(self):
+        stack = self._stack()
+        return self._stats(stack[-1] if stack else "(other)")
+
+    def _charge(self, written, read):
+        stats = self._current()
+        stats.transactions += 1
+        stats.bytes_written += written
+        stats.bytes_read += read
+
+    def _wrap(self, name, method):
+        def wrapper(*args, **kwargs):
+            stats = self._stats(name)
+            stats.calls += 1
+            stack = self._stack()
+            stack.append(name)
+            start = time.monotonic()
+            try:
+                return method(*args, **kwargs)
+            except Exception:
+                stats.errors += 1
+                raise
+            finally:
+                stats.latency.add(time.monotonic() - start)
+                stack.pop()
+        return wrapper
+
+    def _wrap_lock(self, lock):
+        def timed_lock(timeout=None):
+            start = time.monotonic()
+            try:
+                lock(timeout)
+            finally:
+                self._current().lock_wait.add(time.monotonic() - start)
+        return timed_lock
+
+    def attach(self, motor):
+        """
+            Start instrumenting a driver
+
+            :param motor: QwiicScmd
+
+            :return: No return value
+
+        """
+        if self._motor is not None:
+            raise RuntimeError("instrumentation already attached")
+        self._motor = motor
+        self._bus = motor.i2c
+        motor.i2c = _CountingI2C(motor.i2c, self)
+        for name in dir(type(motor)):
+            if name.startswith("_") or name in _NOT_WRAPPED:
+                continue
+            attr = getattr(type(motor), name)
+            if isinstance(attr, property) or not callable(attr):
+                continue
+            setattr(motor, name, self._wrap(name, getattr(motor, name)))
+        motor._lock = self._wrap_lock(motor._lock)
+
+    def detach(self):
+        """
+            Remove the wrappers from the driver; counters are kept
+
+            :return: No return value
+
+        """
+        motor = self._motor
+        if motor is None:
+            return
+        for name in list(vars(motor)):
+            if callable(vars(motor)[name]) and hasattr(type(motor), name):
+                delattr(motor, name)
+        motor.i2c = self._bus
+        self._motor = None
+        self._bus = None
+
+    def reset(self):
+        self.methods = {}
+
+    def snapshot(self):
+        """
+            Counters of every method seen so far, as plain data for telemetry
+
+            :return: dict of method name: calls, errors, transactions,
+                bytes_written, bytes_read and latency / lock_wait histograms
+            :rtype: dict
+
+        """
+        return {name: stats.snapshot() for name, stats in self.methods.items()}
@@ -0,0 +1,176 @@
+# Kinematic mixing for QwiicScmd
+#
+# Turns robot-level commands (throttle/turn, left/right, vx/vy/omega) into
+# wheel speeds and writes all wheels with one QwiicScmd.set_drives() call.
+# When the wheel motors are numbered consecutively that is a single I2C
+# transaction, so every wheel changes at the same moment.
+#
+# Commands and wheel speeds are floats from -1.0 to 1.0. Positive speeds use
+# direction 0, negative speeds direction 1. Wheel inversion is done by the
+# SCMD itself (QwiicScmd.inversion_mode()), so the mixing math never flips
+# signs on its own.
+
+
+def _clip(value):
+    return -1.0 if value < -1.0 else 1.0 if value > 1.0 else value
+
+
+def normalize(speeds):
+    """
+        Scale speeds down together so none exceeds 1.0 in magnitude, which
+        keeps their ratios (and so the direction of travel) intact
+
+        :param speeds: list of wheel speeds, changed in place
+
+        :return: speeds
+        :rtype: list
+
+    """
+    peak = 1.0
+    for speed in speeds:
+        if speed > peak:
+            peak = speed
+        elif -speed > peak:
+            peak = -speed
+    if peak > 1.0:
+        for i in range(len(speeds)):
+            speeds[i] /= peak
+    return speeds
+
+
+def arcade(throttle, turn):
+    """
+        Wheel speeds of a differential drive from throttle and turn
+
+        :param throttle: forward speed, -1.0 to 1.0
+        :param turn: turn rate, -1.0 to 1.0, positive turns right
+
+        :return: [left, right]
+        :rtype: list
+
+    """
+    throttle = _clip(throttle)
+    turn = _clip(turn)
+    return normalize([throttle + turn, throttle - turn])
+
+
+def tank(left, right):
+    """
+        Wheel speeds of a differential drive from per-side speeds
+
+        :return: [left, right], clipped to -1.0 to 1.0
+        :rtype: list
+
+    """
+    return [_clip(left), _clip(right)]
+
+
+def mecanum(vx, vy, omega):
+    """
+        Wheel speeds of a four-wheel mecanum drive
+
+        :param vx: forward speed, -1.0 to 1.0
+        :param vy: sideways speed, -1.0 to 1.0, positive to the right
+        :param omega: rotation, -1.0 to 1.0, positive clockwise
+
+        :return: [front_left, front_right, rear_left, rear_right]
+        :rtype: list
+
+    """
+    vx = _clip(vx)
+    vy = _clip(vy)
+    omega = _clip(omega)
+    return normalize([vx + vy + omega,
+                      vx - vy - omega,
+                      vx - vy + omega,
+                      vx + vy - omega])
+
+
+class _WheelDrive:
+    """
+        Wheels on a QwiicScmd, written together
+
+        :param motor: QwiicScmd
+        :param wheels: motor number of each wheel, in the order the mixing
+            functions return speeds
+        :param invert: None leaves the SCMD's inversion settings as they are;
+            otherwise a polarity (0 or 1) per wheel, written once with
+            inversion_mode()
+
+    """
+
+    def __init__(self, motor, wheels, invert=None):
+        self.motor = motor
+        self.wheels = tuple(wheels)
+        self._drives = {}
+        if invert is not None:
+            if len(invert) != len(self.wheels):
+                raise ValueError("need one polarity per wheel")
+            with motor.session():
+                for motor_num, polarity in zip(self.wheels, invert):
+                    motor.inversion_mode(motor_num, polarity)
+
+    def write(self, speeds):
+        """
+            Write one speed per wheel with a single set_drives() call
+
+            :param speeds: wheel speeds, -1.0 to 1.0
+
+            :return: No return value
+
+        """
+        drives = self._drives
+        for motor_num, speed in zip(self.wheels, speeds):
+            if speed < 0:
+                drives[motor_num] = (1, int(-speed * 255 + 0.5))
+            else:
+                drives[motor_num] = (0, int(speed * 255 + 0.5))
+        self.motor.set_drives(drives)
+
+    def stop(self):
+        self.write([0.0] * len(self.wheels))
+
+
+class DifferentialDrive(_WheelDrive):
+    """
+        Two-sided drive (skid steer, tank treads, two-wheel robots)
+
+        :param motor: QwiicScmd
+        :param left: motor number of the left side
+        :param right: motor number of the right side
+        :param invert: None, or (left polarity, right polarity)
+
+    """
+
+    def __init__(self, motor, left=0, right=1, invert=None):
+        _WheelDrive.__init__(self, motor, (left, right), invert)
+
+    def arcade(self, throttle, turn):
+        self.write(arcade(throttle, turn))
+
+    def tank(self, left, right):
+        self.write(tank(left, right))
+
+
+class MecanumDrive(_WheelDrive):
+    """
+        Four mecanum wheels
+
+        Numbering the wheels consecutively (the default 0 to 3 uses the
+        master's two motors and the first slave's) lets every update go out
+        as one write.
+
+        :param motor: QwiicScmd
+        :param front_left: motor number
+        :param front_right: motor number
+        :param rear_left: motor number
+        :param rear_right: motor number
+        :param invert: None, or four polarities in the same order
+
+    """
+
+    def __init__(self, motor, front_left=0, front_right=1, rear_left=2, rear_right=3, invert=None):
+        _WheelDrive.__init__(self, motor, (front_left, front_right, rear_left, rear_right), invert)
+
+    def drive(self, vx, vy, omega):
+        self.write(mecanum(vx, vy, omega))
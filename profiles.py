@@ -0,0 +1,203 @@
+# Precomputed motion profiles for QwiicScmd
+#
+# Speed ramps are computed up front into compact per-motor arrays, quantized
+# to the drive byte the SCMD will receive, and reduced to the steps where
+# some motor's drive byte actually changes. Playback sleeps to absolute
+# deadlines and issues one set_drives() per changing step.
+#
+# Speeds are signed, -255 to 255: positive is direction 0, negative is
+# direction 1, the same convention as FWD = 0 / BWD = 1 in the examples.
+
+from array import array
+import time
+
+from . import _drive_byte
+
+LINEAR = "linear"
+S_CURVE = "s_curve"
+
+
+def _shape(curve, x):
+    if curve == LINEAR:
+        return x
+    if curve == S_CURVE:
+        # cubic smoothstep: zero acceleration at both ends
+        return x * x * (3.0 - 2.0 * x)
+    raise ValueError("unknown curve %r" % (curve,))
+
+
+def _clip(speed):
+    return -255 if speed < -255 else 255 if speed > 255 else speed
+
+
+def ramp(start, end, duration, rate, curve=LINEAR):
+    """
+        Speeds going from start to end over duration
+
+        :param start: signed speed at the first step
+        :param end: signed speed at the last step
+        :param duration: seconds
+        :param rate: steps per second
+        :param curve: LINEAR (constant acceleration) or S_CURVE
+
+        :return: one signed speed per step
+        :rtype: array('h')
+
+    """
+    steps = max(1, int(round(duration * rate)))
+    span = end - start
+    last = max(1, steps - 1)
+    return array("h", (_clip(int(round(start + span * _shape(curve, i / last)))) for i in range(steps)))
+
+
+def hold(speed, duration, rate):
+    """
+        Constant speed for duration
+
+        :return: one signed speed per step
+        :rtype: array('h')
+
+    """
+    return array("h", [_clip(int(speed))]) * max(0, int(round(duration * rate)))
+
+
+def trapezoid(peak, ramp_time, hold_time, rate, curve=LINEAR, start=0, end=0):
+    """
+        Accelerate from start to peak, hold, then decelerate to end
+
+        With curve=S_CURVE the ramps are jerk-limited, giving an S-curve
+        profile.
+
+        :param peak: signed cruise speed
+        :param ramp_time: seconds for each ramp
+        :param hold_time: seconds at peak
+        :param rate: steps per second
+        :param curve: LINEAR or S_CURVE
+        :param start: signed speed before the move
+        :param end: signed speed after the move
+
+        :return: one signed speed per step
+        :rtype: array('h')
+
+    """
+    return (ramp(start, peak, ramp_time, rate, curve)
+            + hold(peak, hold_time, rate)
+            + ramp(peak, end, ramp_time, rate, curve))
+
+
+def drive_code(speed):
+    """
+        Drive byte the SCMD receives for a signed speed
+
+        :rtype: integer
+        :raises ValueError: if speed is outside -255 to 255
+
+    """
+    return _drive_byte(1, -speed) if speed < 0 else _drive_byte(0, speed)
+
+
+class MotionProfile:
+    """
+        Per-motor speed tracks sharing one step rate
+
+        :param rate: steps per second
+
+    """
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tracks = {}
+        self._frames = None
+
+    def add(self, motor_num, speeds):
+        """
+            Set the track of a motor; a track shorter than the profile holds
+            its last speed
+
+            :param motor_num: motor number 0 to 33
+            :param speeds: signed speeds, one per step
+
+            :return: self, for chaining
+
+        """
+        self.tracks[motor_num] = array("h", speeds)
+        self._frames = None
+        return self
+
+    @property
+    def steps(self):
+        return max((len(track) for track in self.tracks.values()), default=0)
+
+    @property
+    def duration(self):
+        return self.steps / self.rate
+
+    def frames(self):
+        """
+            The steps at which at least one drive byte changes
+
+            Computed once and cached until the tracks change.
+
+            :return: list of (step, {motor_num: (direction, level)})
+            :rtype: list
+
+        """
+        if self._frames is not None:
+            return self._frames
+        codes = {}
+        for motor_num, track in self.tracks.items():
+            codes[motor_num] = array("B", (drive_code(speed) for speed in track))
+        last = {}
+        frames = []
+        for step in range(self.steps):
+            drives = {}
+            for motor_num, track in self.tracks.items():
+                if step >= len(track):
+                    continue
+                code = codes[motor_num][step]
+                if last.get(motor_num) != code:
+                    last[motor_num] = code
+                    speed = track[step]
+                    drives[motor_num] = (1, -speed) if speed < 0 else (0, speed)
+            if drives:
+                frames.append((step, drives))
+        self._frames = frames
+        return frames
+
+    # play( ... )
+    #
+    #     Stream the profile to a QwiicScmd
+    #
+    def play(self, motor, clock=time.monotonic, sleep=time.sleep):
+        """
+            Write the profile to the motor driver, one set_drives() per
+            changing step, each at its deadline (start + step / rate)
+
+            :param motor: QwiicScmd, or anything with set_drives()
+            :param clock: time source in seconds
+            :param sleep: function that waits a number of seconds
+
+            :return: steps, writes, late (writes more than one step behind
+                their deadline) and max_lateness in seconds
+            :rtype: dict
+
+        """
+        period = 1.0 / self.rate
+        frames = self.frames()
+        start = clock()
+        late = 0
+        max_lateness = 0.0
+        for step, drives in frames:
+            deadline = start + step * period
+            delay = deadline - clock()
+            if delay > 0:
+                sleep(delay)
+            else:
+                max_lateness = max(max_lateness, -delay)
+                if -delay > period:
+                    late += 1
+            motor.set_drives(drives)
+        remaining = start + self.steps * period - clock()
+        if remaining > 0:
+            sleep(remaining)
+        return {"steps": self.steps, "writes": len(frames), "late": late, "max_lateness": max_lateness}
@@ -0,0 +1,269 @@
+# Declarative configuration for QwiicScmd
+#
+# A BoardConfig describes what a board should look like (inversion,
+# bridging, user voltages, fail-safe time, enable state). snapshot() reads
+# the current configuration with a few block reads, and provision() writes
+# only the registers that differ from it, packing neighbouring registers
+# into one write. Re-provisioning after fault_safe_reboot() therefore costs
+# a handful of transactions however many slaves are attached.
+
+from . import QwiicScmd
+
+_INVERT_BLOCK = (QwiicScmd.SCMD_MOTOR_A_INVERT, QwiicScmd.SCMD_BRIDGE)
+_SLAVE_BLOCK = (QwiicScmd.SCMD_INV_2_9, QwiicScmd.SCMD_BRIDGE_SLV_H)
+_CONTROL_BLOCK = (QwiicScmd.SCMD_PAGE_SELECT, QwiicScmd.SCMD_FSAFE_TIME)
+# controller 0 and the expansion controllers, which share one register
+_USER_CONTROLLERS = (0, 1)
+# registers of the blocks above that the driver keeps in its shadow
+_SHADOWED = (set(range(_INVERT_BLOCK[0], _INVERT_BLOCK[1] + 1))
+             | set(range(_SLAVE_BLOCK[0], _SLAVE_BLOCK[1] + 1))
+             | {QwiicScmd.SCMD_PAGE_SELECT, QwiicScmd.SCMD_DRIVER_ENABLE, QwiicScmd.SCMD_FSAFE_TIME})
+
+# registers that may be rewritten with their current value to join two writes
+_FILLABLE = _SHADOWED - {QwiicScmd.SCMD_PAGE_SELECT, QwiicScmd.SCMD_DRIVER_ENABLE, QwiicScmd.SCMD_FSAFE_TIME}
+# longest gap worth filling: a gap byte is cheaper than a transaction
+_MAX_GAP = 2
+
+
+class BoardConfig:
+    """
+        Desired (or read back) configuration of one SCMD and its slaves
+
+        Every field left as None is not managed: snapshot() fills it in,
+        provision() leaves it alone.
+
+        :param inverted: motor numbers (0 to 33) that run inverted; every
+            other motor is set to normal polarity
+        :param bridged: driver numbers (0 to 16) that are bridged; every
+            other driver is set unbridged
+        :param user_voltages: dict of controllerNum (0 to 16): voltage.
+            Controllers 1 to 16 share one register (see
+            QwiicScmd.set_user_voltage()) and are kept as controller 1.
+        :param fail_safe_time: fail-safe timeout in ms, 0 for off
+        :param enabled: True to enable the drivers, False to disable them
+
+    """
+
+    def __init__(self, inverted=None, bridged=None, user_voltages=None,
+                 fail_safe_time=None, enabled=None):
+        self.inverted = None if inverted is None else frozenset(inverted)
+        self.bridged = None if bridged is None else frozenset(bridged)
+        self.user_voltages = None if user_voltages is None else _user_voltages(user_voltages)
+        self.fail_safe_time = fail_safe_time
+        self.enabled = enabled
+
+    def registers(self):
+        """
+            The unpaged register values this configuration asks for
+
+            :return: dict of register: value
+            :rtype: dict
+
+        """
+        values = {}
+        if self.inverted is not None:
+            values[QwiicScmd.SCMD_MOTOR_A_INVERT] = 1 if 0 in self.inverted else 0
+            values[QwiicScmd.SCMD_MOTOR_B_INVERT] = 1 if 1 in self.inverted else 0
+            for i in range(4):
+                values[QwiicScmd.SCMD_INV_2_9 + i] = _bits(self.inverted, 2 + 8 * i)
+        if self.bridged is not None:
+            values[QwiicScmd.SCMD_BRIDGE] = 1 if 0 in self.bridged else 0
+            values[QwiicScmd.SCMD_BRIDGE_SLV_L] = _bits(self.bridged, 1)
+            values[QwiicScmd.SCMD_BRIDGE_SLV_H] = _bits(self.bridged, 9)
+        if self.fail_safe_time is not None:
+            values[QwiicScmd.SCMD_FSAFE_TIME] = self.fail_safe_time & 0xFF
+        if self.enabled is not None:
+            values[QwiicScmd.SCMD_DRIVER_ENABLE] = 0x01 if self.enabled else 0x00
+        return values
+
+    @classmethod
+    def from_registers(cls, registers, user_voltages=None):
+        """
+            Decode register values as read from a board
+
+            :param registers: dict of register: value covering the
+                inversion, bridging, enable and fail-safe time registers
+            :param user_voltages: dict of controllerNum: voltage, or None
+
+            :rtype: BoardConfig
+
+        """
+        inverted = set()
+        if registers[QwiicScmd.SCMD_MOTOR_A_INVERT] & 0x01:
+            inverted.add(0)
+        if registers[QwiicScmd.SCMD_MOTOR_B_INVERT] & 0x01:
+            inverted.add(1)
+        for i in range(4):
+            inverted.update(_numbers(registers[QwiicScmd.SCMD_INV_2_9 + i], 2 + 8 * i))
+        bridged = set()
+        if registers[QwiicScmd.SCMD_BRIDGE] & 0x01:
+            bridged.add(0)
+        bridged.update(_numbers(registers[QwiicScmd.SCMD_BRIDGE_SLV_L], 1))
+        bridged.update(_numbers(registers[QwiicScmd.SCMD_BRIDGE_SLV_H], 9))
+        return cls(inverted=inverted, bridged=bridged, user_voltages=user_voltages,
+                   fail_safe_time=registers[QwiicScmd.SCMD_FSAFE_TIME],
+                   enabled=bool(registers[QwiicScmd.SCMD_DRIVER_ENABLE] & 0x01))
+
+    def as_dict(self):
+        """
+            Plain data (lists, dicts, numbers) suitable for JSON; pass it
+            back as BoardConfig(**data)
+
+            :rtype: dict
+
+        """
+        return {
+            "inverted": None if self.inverted is None else sorted(self.inverted),
+            "bridged": None if self.bridged is None else sorted(self.bridged),
+            "user_voltages": self.user_voltages,
+            "fail_safe_time": self.fail_safe_time,
+            "enabled": self.enabled,
+        }
+
+    def __eq__(self, other):
+        return isinstance(other, BoardConfig) and self.as_dict() == other.as_dict()
+
+    def __repr__(self):
+        return "BoardConfig(%s)" % ", ".join("%s=%r" % item for item in self.as_dict().items())
+
+
+def _user_voltages(voltages):
+    # controllerNum: voltage -> {0: voltage, 1: voltage}; keys may be
+    # strings after a round trip through JSON
+    result = {}
+    for controllerNum, voltage in voltages.items():
+        controllerNum = min(int(controllerNum), 1)
+        if result.get(controllerNum, voltage) != voltage:
+            raise ValueError("controllers 1 to 16 share one user voltage register")
+        result[controllerNum] = voltage
+    return result
+
+
+def _bits(numbers, first):
+    # byte with bit i set if first + i is in numbers
+    value = 0
+    for i in range(8):
+        if first + i in numbers:
+            value |= 1 << i
+    return value
+
+
+def _numbers(value, first):
+    return [first + i for i in range(8) if value & (1 << i)]
+
+
+def _read_block(motor, block, registers):
+    # caller holds the lock
+    first, last = block
+    data = motor._read_registers(first, last - first + 1)
+    for i in range(last - first + 1):
+        registers[first + i] = data[i]
+        if first + i in _SHADOWED:
+            motor._shadow[first + i] = data[i]
+            motor._written_at[first + i] = None
+
+
+# snapshot( ... )
+#
+#     Read the configuration of a board
+#
+def snapshot(motor, user_voltages=True):
+    """
+        Read the current configuration with one block read per register
+        group (three in all), plus one per user voltage register
+
+        The driver's configuration shadow is refreshed along the way.
+
+        :param motor: QwiicScmd
+        :param user_voltages: also read the user voltages of controller 0
+            and of the expansion controllers
+
+        :rtype: BoardConfig
+
+    """
+    registers = {}
+    with motor.session():
+        for block in (_INVERT_BLOCK, _SLAVE_BLOCK, _CONTROL_BLOCK):
+            _read_block(motor, block, registers)
+        voltages = motor.get_user_voltages(_USER_CONTROLLERS) if user_voltages else None
+    return BoardConfig.from_registers(registers, voltages)
+
+
+# diff( ... )
+#
+#     What has to be written to get from one configuration to another
+#
+def diff(current, desired):
+    """
+        Registers and user voltages that differ between two configurations
+
+        :param current: BoardConfig as read from the board
+        :param desired: BoardConfig to reach; unmanaged (None) fields are
+            ignored
+
+        :return: (dict of register: value, dict of controllerNum: voltage)
+        :rtype: tuple
+
+    """
+    have = current.registers()
+    registers = {register: value for register, value in desired.registers().items()
+                 if have.get(register) != value}
+    voltages = {}
+    if desired.user_voltages is not None:
+        have_voltages = current.user_voltages or {}
+        voltages = {c: v for c, v in desired.user_voltages.items() if have_voltages.get(c) != v}
+    return registers, voltages
+
+
+def _fill_gaps(registers, current):
+    # bridge short gaps between registers to write with the current value
+    # of the registers in between, so the run goes out as one write; only
+    # inversion and bridging registers are rewritten this way
+    filled = dict(registers)
+    ordered = sorted(registers)
+    for a, b in zip(ordered, ordered[1:]):
+        gap = range(a + 1, b)
+        if 0 < len(gap) <= _MAX_GAP and all(r in _FILLABLE and r in current for r in gap):
+            for r in gap:
+                filled[r] = current[r]
+    return filled
+
+
+# provision( ... )
+#
+#     Bring a board to a configuration with as few writes as possible
+#
+def provision(motor, desired, current=None):
+    """
+        Read the board once, then write only what differs from desired
+
+        Everything happens under one lock hold. Neighbouring registers are
+        written together (short gaps are bridged by rewriting their current
+        value), and the driver enable
+        goes last, so the motors are only enabled once the rest of the
+        configuration is in place.
+
+        :param motor: QwiicScmd
+        :param desired: BoardConfig
+        :param current: BoardConfig known to be on the board, which skips
+            the read; None reads it with snapshot()
+
+        :return: the registers and user voltages that changed, as from diff()
+        :rtype: tuple
+
+    """
+    # on a shared bus without the shadow, other clients stay off between
+    # the read and the writes
+    with motor.session(), motor._hold():
+        if current is None:
+            current = snapshot(motor, user_voltages=desired.user_voltages is not None)
+        registers, voltages = diff(current, desired)
+        changes = dict(registers)
+        enable = registers.pop(QwiicScmd.SCMD_DRIVER_ENABLE, None)
+        if registers:
+            motor._write_registers(_fill_gaps(registers, current.registers()))
+        if voltages:
+            motor.set_user_voltages(voltages)
+        if enable is not None:
+            motor._write_registers({QwiicScmd.SCMD_DRIVER_ENABLE: enable})
+    return changes, voltages
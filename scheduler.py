@@ -0,0 +1,206 @@
+# Fixed-rate drive scheduler for QwiicScmd
+#
+# Application code posts setpoints with set(), which never touches the bus.
+# A background thread wakes on a fixed period, takes the latest setpoint of
+# every motor and writes them with one QwiicScmd.set_drives() call, so
+# application latency and bus latency are decoupled.
+
+import threading
+import time
+
+
+class DriveScheduler:
+    """
+        Flush the latest drive setpoints to a QwiicScmd at a fixed rate
+
+        Ticks are scheduled against absolute deadlines (start + n * period),
+        so sleep error does not accumulate. A tick that finishes after the
+        next deadline counts as an overrun and the missed deadlines are
+        skipped rather than run back to back.
+
+        :param motor: QwiicScmd to write to
+        :param rate: ticks per second
+
+    """
+
+    def __init__(self, motor, rate=100.0):
+        self.motor = motor
+        self.period = 1.0 / rate
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self.reset_stats()
+
+    # set( ... )
+    #
+    #     Post a setpoint; the latest one per motor wins
+    #
+    def set(self, motor_num, direction, level):
+        """
+            Post a setpoint for the next tick; replaces any setpoint of the
+            same motor that has not been written yet
+
+            :param motor_num: motor number 0 to 33
+            :param direction: 0 or 1
+            :param level: 0 to 255
+
+            :return: No return value
+
+        """
+        with self._pending_lock:
+            self._pending[motor_num] = (direction, level)
+
+    def set_many(self, drives):
+        """
+            Post several setpoints at once
+
+            :param drives: dict of motor_num: (direction, level)
+
+            :return: No return value
+
+        """
+        with self._pending_lock:
+            self._pending.update(drives)
+
+    def tick(self):
+        """
+            Write the pending setpoints now; what the background thread does
+            once per period
+
+            If the write fails, setpoints that were not superseded in the
+            meantime are kept for the next tick.
+
+            :return: number of motors written
+            :rtype: integer
+
+        """
+        with self._pending_lock:
+            pending = self._pending
+            if not pending:
+                return 0
+            self._pending = {}
+        try:
+            self.motor.set_drives(pending)
+        except Exception as e:
+            self.errors += 1
+            self.last_error = e
+            with self._pending_lock:
+                for motor_num, drive in pending.items():
+                    self._pending.setdefault(motor_num, drive)
+            return 0
+        self.flushes += 1
+        self.motors_written += len(pending)
+        return len(pending)
+
+    def reset_stats(self):
+        self.ticks = 0
+        self.flushes = 0
+        self.motors_written = 0
+        self.overruns = 0
+        self.missed_ticks = 0
+        self.errors = 0
+        self.last_error = None
+        self.max_tick_time = 0.0
+        self._jitter_n = 0
+        self._jitter_mean = 0.0
+        self._jitter_m2 = 0.0
+        self._jitter_max = 0.0
+
+    def _record_jitter(self, jitter):
+        # Welford running mean/variance, no per-sample storage
+        self._jitter_n += 1
+        delta = jitter - self._jitter_mean
+        self._jitter_mean += delta / self._jitter_n
+        self._jitter_m2 += delta * (jitter - self._jitter_mean)
+        if jitter > self._jitter_max:
+            self._jitter_max = jitter
+
+    def stats(self):
+        """
+            Counters and wake-up jitter since start() or reset_stats()
+
+            Jitter is how late each tick woke up relative to its deadline.
+
+            :return: ticks, flushes, motors_written, overruns, missed_ticks,
+                errors, max_tick_time, jitter_mean, jitter_std, jitter_max
+                (times in seconds)
+            :rtype: dict
+
+        """
+        n = self._jitter_n
+        return {
+            "ticks": self.ticks,
+            "flushes": self.flushes,
+            "motors_written": self.motors_written,
+            "overruns": self.overruns,
+            "missed_ticks": self.missed_ticks,
+            "errors": self.errors,
+            "max_tick_time": self.max_tick_time,
+            "jitter_mean": self._jitter_mean,
+            "jitter_std": (self._jitter_m2 / (n - 1)) ** 0.5 if n > 1 else 0.0,
+            "jitter_max": self._jitter_max,
+        }
+
+    def _run(self):
+        period = self.period
+        deadline = time.monotonic() + period
+        while not self._stop.is_set():
+            delay = deadline - time.monotonic()
+            if delay > 0 and self._stop.wait(delay):
+                break
+            woke = time.monotonic()
+            self._record_jitter(woke - deadline)
+            self.tick()
+            self.ticks += 1
+            done = time.monotonic()
+            if done - woke > self.max_tick_time:
+                self.max_tick_time = done - woke
+            deadline += period
+            if done > deadline:
+                self.overruns += 1
+                missed = int((done - deadline) / period) + 1
+                self.missed_ticks += missed
+                deadline += missed * period
+
+    def start(self):
+        """
+            Start the background thread
+
+            :return: No return value
+
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self.reset_stats()
+        self._thread = threading.Thread(target=self._run, name="DriveScheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, flush=True):
+        """
+            Stop the background thread
+
+            :param flush: write setpoints still pending after the thread stopped
+
+            :return: No return value
+
+        """
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        if flush:
+            self.tick()
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
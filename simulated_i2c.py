@@ -0,0 +1,524 @@
+# Simulated I2C bus with an SCMD register model
+#
+# A software stand-in for busio.I2C so QwiicScmd can be driven on a host
+# without hardware. Every transaction is counted and charged against a simple
+# timing model, which makes the bus cost of the driver measurable.
+#
+# Not intended for CircuitPython boards; copy only __init__.py to CIRCUITPY/lib.
+
+import errno
+import random
+import threading
+import time
+
+# SCMD register map (the subset the model gives behaviour to)
+SCMD_FID = 0x00
+SCMD_ID = 0x01
+SCMD_CONFIG_BITS = 0x03
+SCMD_U_I2C_RD_ERR = 0x04
+SCMD_U_I2C_WR_ERR = 0x05
+SCMD_U_BUF_DUMPED = 0x06
+SCMD_E_I2C_RD_ERR = 0x07
+SCMD_E_I2C_WR_ERR = 0x08
+SCMD_LOOP_TIME = 0x09
+SCMD_SLV_POLL_CNT = 0x0A
+SCMD_SLV_TOP_ADDR = 0x0B
+SCMD_MST_E_ERR = 0x0C
+SCMD_MST_E_STATUS = 0x0D
+SCMD_FSAFE_FAULTS = 0x0E
+SCMD_REG_OOR_CNT = 0x0F
+SCMD_REG_RO_WRITE_CNT = 0x10
+SCMD_GEN_TEST_WORD = 0x11
+SCMD_MOTOR_A_INVERT = 0x12
+SCMD_MOTOR_B_INVERT = 0x13
+SCMD_BRIDGE = 0x14
+SCMD_FSAFE_CTRL = 0x1F
+SCMD_MA_DRIVE = 0x20
+SCMD_S16B_DRIVE = 0x41
+SCMD_INV_2_9 = 0x50
+SCMD_BRIDGE_SLV_H = 0x55
+SCMD_PAGE_SELECT = 0x6F
+SCMD_DRIVER_ENABLE = 0x70
+SCMD_FSAFE_TIME = 0x76
+SCMD_STATUS_1 = 0x77
+SCMD_REM_ADDR = 0x79
+SCMD_REM_OFFSET = 0x7A
+SCMD_REM_DATA_WR = 0x7B
+SCMD_REM_DATA_RD = 0x7C
+SCMD_REM_WRITE = 0x7D
+SCMD_REM_READ = 0x7E
+
+ID_WORD = 0xA9
+FIRMWARE_VERSION = 0x07
+START_SLAVE_ADDR = 0x50
+
+SCMD_ENUMERATION_BIT = 0x01
+SCMD_BUSY_BIT = 0x02
+SCMD_REM_READ_BIT = 0x04
+SCMD_REM_WRITE_BIT = 0x08
+SCMD_HW_EN_BIT = 0x10
+
+SCMD_FSAFE_DRIVE_KILL = 0x01
+SCMD_FSAFE_REBOOT = 0x02
+SCMD_FSAFE_RE_ENUM = 0x04
+SCMD_FSAFE_CYCLE_USER = 0x08
+SCMD_FSAFE_CYCLE_EXP = 0x10
+
+_REGISTER_COUNT = 0x80
+_DRIVE_NEUTRAL = 0x80
+
+_READ_ONLY = (
+    set(range(SCMD_FID, SCMD_GEN_TEST_WORD))
+    | {SCMD_STATUS_1, SCMD_REM_DATA_RD}
+)
+_WRITABLE = (
+    set(range(SCMD_GEN_TEST_WORD, SCMD_S16B_DRIVE + 1))
+    | set(range(SCMD_INV_2_9, SCMD_BRIDGE_SLV_H + 1))
+    | set(range(SCMD_PAGE_SELECT, _REGISTER_COUNT))
+) - _READ_ONLY
+
+# errno Blinka reports when nothing ACKs the address
+_EREMOTEIO = getattr(errno, "EREMOTEIO", 121)
+
+
+class I2CTiming:
+    """
+        Timing model for one I2C transaction
+
+        A transaction costs a fixed host overhead, start/stop conditions and
+        9 clocks (8 data bits plus ACK) for every byte on the wire, address
+        bytes included.
+
+        :param frequency: SCL clock in Hz
+        :param transaction_overhead: seconds of host/driver latency per transaction
+        :param byte_overhead: extra seconds per byte (clock stretching, FIFO refills)
+
+    """
+
+    def __init__(self, frequency=100000, transaction_overhead=0.0, byte_overhead=0.0):
+        self.frequency = frequency
+        self.transaction_overhead = transaction_overhead
+        self.byte_overhead = byte_overhead
+
+    def transaction_time(self, wire_bytes, starts=1):
+        """
+            Modeled duration of a transaction
+
+            :param wire_bytes: bytes clocked, including address bytes
+            :param starts: number of (repeated) start conditions
+
+            :return: duration in seconds
+            :rtype: float
+
+        """
+        bits = 9 * wire_bytes + starts + 1
+        return (self.transaction_overhead
+                + bits / self.frequency
+                + wire_bytes * self.byte_overhead)
+
+
+class SimulatedSCMD:
+    """
+        Register-level model of one SCMD master board
+
+        Writes set the register pointer from their first byte and then store
+        the remaining bytes with auto-increment; reads continue from the
+        pointer. Writes to read-only or unmapped registers bump the
+        REG_RO_WRITE_CNT / REG_OOR_CNT diagnostics like the firmware does.
+
+        :param slaves: number of enumerated expansion slaves (0 to 16)
+        :param enumeration_time: seconds after boot/re-enumeration before the
+            enumeration bit in STATUS_1 is set
+        :param remote_time: seconds a remote read/write (REM_READ/REM_WRITE)
+            takes; STATUS_1 shows it in progress meanwhile
+
+    """
+
+    def __init__(self, slaves=0, enumeration_time=0.0, remote_time=0.0):
+        self.slaves = slaves
+        self.enumeration_time = enumeration_time
+        self.remote_time = remote_time
+        self.registers = bytearray(_REGISTER_COUNT)
+        # register files of the expansion slaves, by slave address
+        self.slave_registers = {}
+        for address in range(START_SLAVE_ADDR, START_SLAVE_ADDR + slaves):
+            registers = bytearray(_REGISTER_COUNT)
+            registers[SCMD_FID] = FIRMWARE_VERSION
+            registers[SCMD_ID] = ID_WORD
+            self.slave_registers[address] = registers
+        # pending remote operation: SCMD_REM_READ or SCMD_REM_WRITE, or None
+        self._remote_op = None
+        self._remote_done_at = 0.0
+        self.pointer = 0
+        self.user_cycles = 0
+        self.expansion_cycles = 0
+        self._now = 0.0
+        self._enumerated_at = 0.0
+        self._last_write = 0.0
+        self.reboot(0.0)
+
+    # reboot( ... )
+    #
+    #     Power-on state: neutral drives, disabled, no inversion/bridging
+    #
+    def reboot(self, now):
+        """
+            Return every register to its power-on value
+
+            :param now: model time of the reboot
+
+            :return: No return value
+
+        """
+        faults = self.registers[SCMD_FSAFE_FAULTS]
+        self.registers[:] = bytes(_REGISTER_COUNT)
+        self.registers[SCMD_FID] = FIRMWARE_VERSION
+        self.registers[SCMD_ID] = ID_WORD
+        self.registers[SCMD_FSAFE_FAULTS] = faults
+        for reg in range(SCMD_MA_DRIVE, SCMD_S16B_DRIVE + 1):
+            self.registers[reg] = _DRIVE_NEUTRAL
+        self.pointer = 0
+        self.re_enumerate(now)
+
+    def re_enumerate(self, now):
+        """
+            Restart slave enumeration; STATUS_1 reports not-ready meanwhile
+
+            :param now: model time the enumeration starts
+
+            :return: No return value
+
+        """
+        self._enumerated_at = now + self.enumeration_time
+        self._last_write = now
+        if self.slaves:
+            self.registers[SCMD_SLV_TOP_ADDR] = START_SLAVE_ADDR + self.slaves - 1
+        else:
+            self.registers[SCMD_SLV_TOP_ADDR] = 0
+
+    @property
+    def enumerated(self):
+        return self._now >= self._enumerated_at
+
+    def drive(self, motor_num):
+        """
+            Raw drive byte of a motor (0x80 is stopped)
+
+            :param motor_num: motor number 0 to 33
+
+            :return: register value
+            :rtype: integer
+
+        """
+        return self.registers[SCMD_MA_DRIVE + motor_num]
+
+    def _tick(self, now):
+        self._now = now
+        # fail-safe: no write within FSAFE_TIME ms stops every motor
+        timeout = self.registers[SCMD_FSAFE_TIME] / 1000.0
+        if timeout and now - self._last_write > timeout:
+            self.registers[SCMD_FSAFE_FAULTS] = (self.registers[SCMD_FSAFE_FAULTS] + 1) & 0xFF
+            for reg in range(SCMD_MA_DRIVE, SCMD_S16B_DRIVE + 1):
+                self.registers[reg] = _DRIVE_NEUTRAL
+            self._last_write = now
+        if self._remote_op is not None and now >= self._remote_done_at:
+            self._finish_remote()
+        status = SCMD_HW_EN_BIT
+        if self.enumerated:
+            status |= SCMD_ENUMERATION_BIT
+        else:
+            status |= SCMD_BUSY_BIT
+        if self._remote_op == SCMD_REM_READ:
+            status |= SCMD_REM_READ_BIT
+        elif self._remote_op == SCMD_REM_WRITE:
+            status |= SCMD_REM_WRITE_BIT
+        self.registers[SCMD_STATUS_1] = status
+
+    def _finish_remote(self):
+        # carry out the pending REM_READ / REM_WRITE against a slave
+        op = self._remote_op
+        self._remote_op = None
+        self.registers[op] = 0
+        slave = self.slave_registers.get(self.registers[SCMD_REM_ADDR])
+        offset = self.registers[SCMD_REM_OFFSET] % _REGISTER_COUNT
+        if op == SCMD_REM_READ:
+            if slave is None:
+                self.registers[SCMD_E_I2C_RD_ERR] = (self.registers[SCMD_E_I2C_RD_ERR] + 1) & 0xFF
+                self.registers[SCMD_REM_DATA_RD] = 0
+            else:
+                self.registers[SCMD_REM_DATA_RD] = slave[offset]
+        elif slave is None:
+            self.registers[SCMD_E_I2C_WR_ERR] = (self.registers[SCMD_E_I2C_WR_ERR] + 1) & 0xFF
+        else:
+            slave[offset] = self.registers[SCMD_REM_DATA_WR]
+
+    def _read_reg(self, reg):
+        return self.registers[reg]
+
+    def _write_reg(self, reg, value):
+        if reg >= _REGISTER_COUNT or (reg not in _WRITABLE and reg not in _READ_ONLY):
+            self.registers[SCMD_REG_OOR_CNT] = (self.registers[SCMD_REG_OOR_CNT] + 1) & 0xFF
+        elif reg in _READ_ONLY:
+            self.registers[SCMD_REG_RO_WRITE_CNT] = (self.registers[SCMD_REG_RO_WRITE_CNT] + 1) & 0xFF
+        elif reg == SCMD_FSAFE_CTRL:
+            self._fail_safe_control(value)
+        elif reg in (SCMD_REM_READ, SCMD_REM_WRITE) and value:
+            self.registers[reg] = value
+            if self._remote_op is None:
+                self._remote_op = reg
+                self._remote_done_at = self._now + self.remote_time
+        else:
+            self.registers[reg] = value
+
+    def _fail_safe_control(self, value):
+        if value & SCMD_FSAFE_DRIVE_KILL:
+            self.registers[SCMD_DRIVER_ENABLE] = 0
+        if value & SCMD_FSAFE_REBOOT:
+            self.reboot(self._now)
+        elif value & SCMD_FSAFE_RE_ENUM:
+            self.re_enumerate(self._now)
+        if value & SCMD_FSAFE_CYCLE_USER:
+            self.user_cycles += 1
+        if value & SCMD_FSAFE_CYCLE_EXP:
+            self.expansion_cycles += 1
+
+    def i2c_write(self, data, now):
+        """
+            Handle the data phase of a write transaction
+
+            :param data: bytes after the address byte
+            :param now: model time of the transaction
+
+            :return: No return value
+
+        """
+        self._tick(now)
+        if not data:
+            return
+        self._last_write = now
+        self.pointer = data[0]
+        for value in data[1:]:
+            self._write_reg(self.pointer, value)
+            self.pointer += 1
+
+    def i2c_read(self, buffer, now):
+        """
+            Handle the data phase of a read transaction
+
+            :param buffer: memoryview to fill from the register pointer
+            :param now: model time of the transaction
+
+            :return: No return value
+
+        """
+        self._tick(now)
+        for i in range(len(buffer)):
+            buffer[i] = self._read_reg(self.pointer) if self.pointer < _REGISTER_COUNT else 0xFF
+            self.pointer += 1
+
+
+class SimulatedI2C:
+    """
+        busio.I2C compatible bus populated with simulated devices
+
+        Lock handling follows busio: transactions require the lock, which is
+        taken with try_lock() and never blocks. Statistics accumulate until
+        reset_stats().
+
+        :param devices: dict of address to device; defaults to one
+            SimulatedSCMD at 0x5D
+        :param frequency: SCL clock in Hz
+        :param transaction_overhead: seconds of host latency per transaction
+        :param byte_overhead: extra seconds per byte on the wire
+        :param realtime: sleep for the modeled duration of each transaction
+            and run the device clocks on time.monotonic()
+        :param error_rate: probability that a transaction fails with
+            OSError(error_errno) before reaching the device, for fault
+            injection
+        :param error_errno: errno of injected failures
+        :param seed: seed for the fault injection, for repeatable runs
+
+    """
+
+    def __init__(self, devices=None, frequency=100000, transaction_overhead=0.0,
+                 byte_overhead=0.0, realtime=False, error_rate=0.0,
+                 error_errno=_EREMOTEIO, seed=None):
+        self.devices = dict(devices) if devices is not None else {0x5D: SimulatedSCMD()}
+        self.timing = I2CTiming(frequency, transaction_overhead, byte_overhead)
+        self.realtime = realtime
+        self.error_rate = error_rate
+        self.error_errno = error_errno
+        self._random = random.Random(seed)
+        self._fail_next = []
+        self._lock = threading.Lock()
+        self._epoch = time.monotonic()
+        self._elapsed = 0.0
+        self.reset_stats()
+
+    @property
+    def frequency(self):
+        return self.timing.frequency
+
+    def add_device(self, address, device):
+        self.devices[address] = device
+
+    def now(self):
+        """
+            Current device clock: modeled bus time plus advance(), or wall
+            time in realtime mode
+
+            :return: seconds
+            :rtype: float
+
+        """
+        if self.realtime:
+            return time.monotonic() - self._epoch
+        return self._elapsed
+
+    def advance(self, seconds):
+        """
+            Let the model clock run without bus traffic
+
+            :param seconds: idle time to add
+
+            :return: No return value
+
+        """
+        self._elapsed += seconds
+
+    def reset_stats(self):
+        self.transactions = 0
+        self.bytes_written = 0
+        self.bytes_read = 0
+        self.lock_acquisitions = 0
+        self.lock_contentions = 0
+        self.bus_time = 0.0
+        self.errors_injected = 0
+
+    # fail_next( ... )
+    #
+    #     Make the next transactions fail
+    #
+    #   count -- number of transactions
+    #   errno_value -- errno to raise, default error_errno
+    def fail_next(self, count=1, errno_value=None):
+        """
+            Fail the next count transactions with OSError, in addition to
+            any random error_rate failures
+
+            :param count: number of transactions
+            :param errno_value: errno to raise, default error_errno
+
+            :return: No return value
+
+        """
+        self._fail_next.extend([errno_value or self.error_errno] * count)
+
+    def stats(self):
+        """
+            Snapshot of the counters since the last reset_stats()
+
+            :return: transactions, bytes_written, bytes_read, lock_acquisitions,
+                lock_contentions, errors_injected and bus_time (seconds)
+            :rtype: dict
+
+        """
+        return {
+            "transactions": self.transactions,
+            "bytes_written": self.bytes_written,
+            "bytes_read": self.bytes_read,
+            "lock_acquisitions": self.lock_acquisitions,
+            "lock_contentions": self.lock_contentions,
+            "errors_injected": self.errors_injected,
+            "bus_time": self.bus_time,
+        }
+
+    # busio.I2C interface
+
+    def try_lock(self):
+        if self._lock.acquire(False):
+            self.lock_acquisitions += 1
+            return True
+        self.lock_contentions += 1
+        return False
+
+    def unlock(self):
+        self._lock.release()
+
+    def deinit(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.deinit()
+
+    def _transaction(self, address, written, read, starts=1):
+        if not self._lock.locked():
+            raise RuntimeError("Function requires lock")
+        addr_bytes = starts
+        duration = self.timing.transaction_time(addr_bytes + written + read, starts)
+        self.transactions += 1
+        self.bytes_written += written
+        self.bytes_read += read
+        self.bus_time += duration
+        self._elapsed += duration
+        if self.realtime:
+            time.sleep(duration)
+        if self._fail_next:
+            self.errors_injected += 1
+            error = self._fail_next.pop(0)
+            raise OSError(error, "injected I2C error")
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.errors_injected += 1
+            raise OSError(self.error_errno, "injected I2C error")
+        device = self.devices.get(address)
+        if device is None:
+            raise OSError(_EREMOTEIO, "Remote I/O error")
+        return device
+
+    def scan(self):
+        found = []
+        for address in range(0x08, 0x78):
+            try:
+                self._transaction(address, 0, 0)
+            except OSError:
+                continue
+            found.append(address)
+        return found
+
+    def writeto(self, address, buffer, *, start=0, end=None):
+        data = bytes(memoryview(buffer)[start:end])
+        device = self._transaction(address, len(data), 0)
+        device.i2c_write(data, self.now())
+
+    def readfrom_into(self, address, buffer, *, start=0, end=None):
+        view = memoryview(buffer)[start:end]
+        device = self._transaction(address, 0, len(view))
+        device.i2c_read(view, self.now())
+
+    def writeto_then_readfrom(self, address, buffer_out, buffer_in, *, out_start=0,
+                              out_end=None, in_start=0, in_end=None):
+        data = bytes(memoryview(buffer_out)[out_start:out_end])
+        view = memoryview(buffer_in)[in_start:in_end]
+        device = self._transaction(address, len(data), len(view), starts=2)
+        now = self.now()
+        device.i2c_write(data, now)
+        device.i2c_read(view, now)
+
+    def readfrom(self, address, nbytes):
+        """
+            machine.I2C style read, kept so code written against MicroPython
+            can run on the simulator
+
+            :param address: 7-bit device address
+            :param nbytes: number of bytes to read
+
+            :return: the bytes read
+            :rtype: bytes
+
+        """
+        buffer = bytearray(nbytes)
+        self.readfrom_into(address, buffer)
+        return bytes(buffer)
@@ -0,0 +1,15 @@
+# The checkout is the Qwiic_SCMD_CP package itself; make it importable under
+# that name when pytest runs from inside it.
+
+import importlib.util
+import os
+import sys
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if "Qwiic_SCMD_CP" not in sys.modules:
+    _spec = importlib.util.spec_from_file_location("Qwiic_SCMD_CP", os.path.join(_ROOT, "__init__.py"),
+                                                   submodule_search_locations=[_ROOT])
+    _module = importlib.util.module_from_spec(_spec)
+    sys.modules["Qwiic_SCMD_CP"] = _module
+    _spec.loader.exec_module(_module)
@@ -0,0 +1,93 @@
+# Several QwiicScmd clients of one BusBroker must not undo each other's
+# configuration: each process has its own driver, so nothing it remembers
+# about the board can be trusted.
+
+import os
+import tempfile
+import threading
+
+import pytest
+
+from Qwiic_SCMD_CP import QwiicScmd
+from Qwiic_SCMD_CP.broker import BusBroker, BrokerI2C
+from Qwiic_SCMD_CP.simulated_i2c import SimulatedI2C, SimulatedSCMD
+
+
+@pytest.fixture
+def broker():
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "scmd.sock")
+    bus = SimulatedI2C({0x5D: SimulatedSCMD(slaves=4)})
+    with BusBroker(bus, path, tick=0.0005):
+        clients = []
+
+        def client():
+            i2c = BrokerI2C(path)
+            clients.append(i2c)
+            return QwiicScmd(i2c_driver=i2c)
+
+        yield bus.devices[0x5D], client
+        for i2c in clients:
+            i2c.deinit()
+    os.rmdir(directory)
+
+
+def test_clients_do_not_trust_the_shadow(broker):
+    _, client = broker
+    assert not client().shadow_config
+    assert QwiicScmd(i2c_driver=SimulatedI2C()).shadow_config
+
+
+def test_inversion_bits_of_other_clients_survive(broker):
+    device, client = broker
+    a, b = client(), client()
+    a.inversion_mode(2, 1)
+    b.inversion_mode(3, 1)
+    a.inversion_mode(4, 1)
+    assert device.registers[QwiicScmd.SCMD_INV_2_9] == 0b111
+
+
+def test_page_selection_of_other_clients_is_not_trusted(broker):
+    device, client = broker
+    a, b = client(), client()
+    a.select_page(1)
+    b.select_page(0)
+    a.select_page(1)
+    assert device.registers[QwiicScmd.SCMD_PAGE_SELECT] == 1
+    assert b.get_page() == 1
+
+
+def test_fail_safe_time_of_other_clients_is_read(broker):
+    _, client = broker
+    a, b = client(), client()
+    assert a.get_fail_safe_time() == 0
+    b.set_fail_safe_time(50)
+    assert a.get_fail_safe_time() == 50
+
+
+def test_concurrent_read_modify_write(broker):
+    device, client = broker
+    motors = [client() for _ in range(4)]
+
+    def toggle(motor, motor_num):
+        for _ in range(20):
+            motor.inversion_mode(motor_num, 1)
+            motor.inversion_mode(motor_num, 0)
+        motor.inversion_mode(motor_num, 1)
+
+    threads = [threading.Thread(target=toggle, args=(motor, 2 + n)) for n, motor in enumerate(motors)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert device.registers[QwiicScmd.SCMD_INV_2_9] == 0b1111
+
+
+def test_holds_nest(broker):
+    device, client = broker
+    motor = client()
+    with motor.i2c.hold():
+        motor.inversion_mode(5, 1)
+        assert motor.i2c._holds == 1
+    assert motor.i2c._holds == 0
+    assert device.registers[QwiicScmd.SCMD_INV_2_9] == 0b1000
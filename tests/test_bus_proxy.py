@@ -0,0 +1,37 @@
+# Bus wrappers share BusProxy; a driver behind any of them shares the scan
+# cache of the real bus.
+
+import os
+import tempfile
+
+from Qwiic_SCMD_CP import QwiicScmd
+from Qwiic_SCMD_CP.bus_trace import TraceRecorder
+from Qwiic_SCMD_CP.simulated_i2c import SimulatedI2C
+from Qwiic_SCMD_CP.transport import RetryingI2C
+
+
+def test_wrapped_bus_is_the_end_of_the_chain():
+    bus = SimulatedI2C(frequency=400000)
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "bus.trace")
+    with TraceRecorder(bus, path) as recorder:
+        retrying = RetryingI2C(recorder)
+        assert retrying.wrapped_bus is bus
+        assert retrying.frequency == 400000
+        motor = QwiicScmd(i2c_driver=retrying)
+        motor.set_drive(0, 1, 100)
+        assert recorder.records == 1
+    os.remove(path)
+    os.rmdir(directory)
+
+
+def test_instrumented_driver_shares_the_scan_cache():
+    bus = SimulatedI2C()
+    motor = QwiicScmd(i2c_driver=bus)
+    motor.scan()
+    motor.enable_instrumentation()
+    bus.reset_stats()
+    assert motor.scan(max_age=60) == [0x5D]
+    assert QwiicScmd(i2c_driver=RetryingI2C(bus)).scan(max_age=60) == [0x5D]
+    assert bus.stats()["transactions"] == 0
+    motor.disable_instrumentation()
@@ -0,0 +1,91 @@
+# Recording with TraceRecorder and reading/replaying the result.
+
+import os
+import tempfile
+
+import pytest
+
+from Qwiic_SCMD_CP import QwiicScmd
+from Qwiic_SCMD_CP.bus_trace import (MAGIC, READ, WRITE, WRITE_READ, TraceRecorder,
+                                     read_trace, replay)
+from Qwiic_SCMD_CP.simulated_i2c import SimulatedI2C
+
+
+@pytest.fixture
+def path():
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "bus.trace")
+    yield path
+    if os.path.exists(path):
+        os.remove(path)
+    os.rmdir(directory)
+
+
+def _record(path, action):
+    bus = SimulatedI2C()
+    with TraceRecorder(bus, path) as recorder:
+        assert recorder.try_lock()
+        try:
+            action(recorder)
+        finally:
+            recorder.unlock()
+    return bus
+
+
+def test_round_trip(path):
+    def action(i2c):
+        i2c.writeto(0x5D, bytes([QwiicScmd.SCMD_MA_DRIVE, 0x90]))
+        buffer = bytearray(1)
+        i2c.writeto_then_readfrom(0x5D, bytes([QwiicScmd.SCMD_MA_DRIVE]), buffer)
+        i2c.readfrom_into(0x5D, buffer)
+
+    _record(path, action)
+    records = list(read_trace(path))
+    assert [record.kind for record in records] == [WRITE, WRITE_READ, READ]
+    assert records[0].written == bytes([QwiicScmd.SCMD_MA_DRIVE, 0x90])
+    assert records[1].read == b"\x90"
+    assert not any(record.error for record in records)
+
+
+def test_failed_read_keeps_its_length(path):
+    def action(i2c):
+        i2c.i2c.fail_next()
+        with pytest.raises(OSError):
+            i2c.writeto_then_readfrom(0x5D, bytes([QwiicScmd.SCMD_ID]), bytearray(3))
+        i2c.writeto(0x5D, bytes([QwiicScmd.SCMD_MA_DRIVE, 0x90]))
+
+    _record(path, action)
+    failed, written = read_trace(path)
+    assert failed.error and failed.read == b"" and failed.read_length == 3
+    assert written.kind == WRITE and not written.error
+
+
+def test_appending_continues_the_trace(path):
+    for value in (0x81, 0x82, 0x83):
+        _record(path, lambda i2c: i2c.writeto(0x5D, bytes([QwiicScmd.SCMD_MA_DRIVE, value])))
+    with open(path, "rb") as f:
+        assert f.read().count(MAGIC) == 1
+    assert [record.written[1] for record in read_trace(path)] == [0x81, 0x82, 0x83]
+
+
+def test_embedded_magic_is_a_continuation(path):
+    for _ in range(2):
+        _record(path, lambda i2c: i2c.writeto(0x5D, bytes([QwiicScmd.SCMD_MA_DRIVE, 0x90])))
+    with open(path, "rb") as f:
+        data = f.read()
+    with open(path, "wb") as f:
+        f.write(data + data + MAGIC)
+    assert len(list(read_trace(path))) == 4
+
+
+def test_replay_reproduces_the_traffic(path):
+    recorded = SimulatedI2C()
+    with TraceRecorder(recorded, path) as recorder:
+        motor = QwiicScmd(i2c_driver=recorder)
+        motor.begin()
+        motor.set_drives({0: (1, 100), 1: (0, 100)})
+        motor.inversion_mode(1, 1)
+    bus = SimulatedI2C()
+    stats = replay(path, bus)
+    assert stats == {"records": recorded.stats()["transactions"], "errors": 0, "mismatches": 0}
+    assert bus.devices[0x5D].registers == recorded.devices[0x5D].registers
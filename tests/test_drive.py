@@ -0,0 +1,83 @@
+# Drive bytes and the writes that carry them, checked on the simulated bus.
+
+import pytest
+
+from Qwiic_SCMD_CP import QwiicScmd, _write_packed
+from Qwiic_SCMD_CP.profiles import drive_code
+from Qwiic_SCMD_CP.simulated_i2c import SimulatedI2C
+
+
+@pytest.fixture
+def bus():
+    return SimulatedI2C()
+
+
+def _arduino_drive(direction, level):
+    # SCMD::setDrive() from the SparkFun Arduino library
+    level = (level + 1 - direction) // 2
+    return (level * direction) + (level * (direction - 1)) + 128
+
+
+@pytest.mark.parametrize("direction", (0, 1))
+def test_drive_bytes_match_the_arduino_library(bus, direction):
+    motor = QwiicScmd(i2c_driver=bus)
+    device = bus.devices[0x5D]
+    for level in range(256):
+        motor.set_drive(0, direction, level)
+        assert device.registers[QwiicScmd.SCMD_MA_DRIVE] == _arduino_drive(direction, level)
+
+
+def test_float_level_is_truncated(bus):
+    motor = QwiicScmd(i2c_driver=bus)
+    motor.set_drive(0, 1, 100.7)
+    assert bus.devices[0x5D].registers[QwiicScmd.SCMD_MA_DRIVE] == _arduino_drive(1, 100)
+
+
+@pytest.mark.parametrize("direction, level", ((0, -1), (1, -1), (0, 256), (2, 10), (-1, 10)))
+def test_out_of_range_drive_is_rejected(bus, direction, level):
+    motor = QwiicScmd(i2c_driver=bus)
+    motor.set_drive(0, 1, 200)
+    bus.reset_stats()
+    with pytest.raises(ValueError):
+        motor.set_drive(0, direction, level)
+    with pytest.raises(ValueError):
+        motor.set_drives({0: (direction, level)})
+    assert bus.stats()["transactions"] == 0
+    assert bus.devices[0x5D].registers[QwiicScmd.SCMD_MA_DRIVE] == _arduino_drive(1, 200)
+
+
+def test_drive_code_is_signed(bus):
+    assert drive_code(0) == 0x80
+    assert drive_code(255) == _arduino_drive(0, 255)
+    assert drive_code(-255) == _arduino_drive(1, 255)
+    with pytest.raises(ValueError):
+        drive_code(256)
+
+
+def test_consecutive_motors_share_one_write(bus):
+    motor = QwiicScmd(i2c_driver=bus)
+    bus.reset_stats()
+    motor.set_drives({n: (n & 1, n) for n in range(34)})
+    assert bus.stats()["transactions"] == 1
+    assert bus.stats()["bytes_written"] == 35
+    device = bus.devices[0x5D]
+    assert [device.drive(n) for n in range(34)] == [_arduino_drive(n & 1, n) for n in range(34)]
+
+
+def test_gaps_split_the_writes(bus):
+    motor = QwiicScmd(i2c_driver=bus)
+    bus.reset_stats()
+    motor.set_drives({6: (1, 60), 0: (1, 0), 1: (1, 10), 5: (0, 50), 33: (0, 255)})
+    assert bus.stats()["transactions"] == 3
+    device = bus.devices[0x5D]
+    assert device.drive(5) == _arduino_drive(0, 50) and device.drive(33) == 0
+
+
+def test_runs_longer_than_the_buffer_are_chunked(bus):
+    assert bus.try_lock()
+    try:
+        writes = _write_packed(bus, 0x5D, bytearray(4), {0x20 + n: n for n in range(7)})
+    finally:
+        bus.unlock()
+    assert writes == 3
+    assert bytes(bus.devices[0x5D].registers[0x20:0x27]) == bytes(range(7))
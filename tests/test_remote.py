@@ -0,0 +1,67 @@
+# Remote reads of expansion slaves through the master's REM_* registers.
+
+import threading
+
+import pytest
+
+from Qwiic_SCMD_CP import QwiicScmd
+from Qwiic_SCMD_CP.simulated_i2c import SimulatedI2C, SimulatedSCMD
+
+
+def _bus(remote_time=0.0, realtime=False):
+    return SimulatedI2C({0x5D: SimulatedSCMD(slaves=2, remote_time=remote_time)}, realtime=realtime)
+
+
+def _set_counters(device, address, value):
+    for _, register in QwiicScmd._REMOTE_DIAG:
+        device.slave_registers[address][register] = value
+
+
+def test_remote_diagnostics_are_read_from_the_slave():
+    bus = _bus()
+    _set_counters(bus.devices[0x5D], 0x51, 7)
+    motor = QwiicScmd(i2c_driver=bus)
+    bus.reset_stats()
+    diagnostics = motor.get_remote_diagnostics(0x51)
+    assert diagnostics.E_I2C_RD_ERR == 7 and diagnostics.REG_RO_WRITE_CNT == 7
+    # address/offset write, trigger write and one status+data read each
+    assert bus.stats()["transactions"] == 3 * len(QwiicScmd._REMOTE_DIAG)
+
+
+def test_pending_remote_read_is_polled():
+    bus = _bus(remote_time=0.0005)
+    _set_counters(bus.devices[0x5D], 0x50, 3)
+    motor = QwiicScmd(i2c_driver=bus)
+    assert motor.get_remote_diagnostics(0x50).LOOP_TIME == 3
+
+
+def test_remote_read_times_out_and_can_be_retried():
+    bus = _bus(remote_time=10.0)
+    motor = QwiicScmd(i2c_driver=bus)
+    motor.remote_timeout = 0.01
+    with pytest.raises(RuntimeError):
+        motor.get_remote_diagnostics(0x50)
+    bus.advance(10.0)
+    bus.devices[0x5D].remote_time = 0.0
+    _set_counters(bus.devices[0x5D], 0x50, 4)
+    assert motor.get_remote_diagnostics(0x50).LOOP_TIME == 4
+
+
+def test_drivers_sharing_the_remote_registers():
+    bus = _bus(remote_time=0.003, realtime=True)
+    device = bus.devices[0x5D]
+    _set_counters(device, 0x50, 1)
+    _set_counters(device, 0x51, 2)
+    results = {}
+
+    def read(address):
+        motor = QwiicScmd(i2c_driver=bus)
+        motor.remote_timeout = 1.0
+        results[address] = [motor.get_remote_diagnostics(address).LOOP_TIME for _ in range(3)]
+
+    threads = [threading.Thread(target=read, args=(address,)) for address in (0x50, 0x51)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {0x50: [1, 1, 1], 0x51: [2, 2, 2]}
@@ -0,0 +1,52 @@
+# session(): one lock hold across calls, with a timeout per session.
+
+import threading
+import time
+
+import pytest
+
+from Qwiic_SCMD_CP import QwiicScmd
+from Qwiic_SCMD_CP.simulated_i2c import SimulatedI2C
+
+
+def test_session_holds_the_bus_once():
+    bus = SimulatedI2C()
+    motor = QwiicScmd(i2c_driver=bus)
+    bus.reset_stats()
+    with motor.session() as held:
+        assert held is motor
+        motor.set_drive(0, 1, 100)
+        motor.set_drive(1, 1, 100)
+    assert bus.stats()["lock_acquisitions"] == 1
+
+
+def test_each_session_keeps_its_own_timeout():
+    motor = QwiicScmd(i2c_driver=SimulatedI2C())
+    holding, release = threading.Event(), threading.Event()
+
+    def hold():
+        with motor.session():
+            holding.set()
+            release.wait()
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    holding.wait()
+    try:
+        short = motor.session(timeout=0.01)
+        motor.session(timeout=5.0)
+        start = time.monotonic()
+        with pytest.raises(RuntimeError):
+            with short:
+                pass
+        assert time.monotonic() - start < 1.0
+    finally:
+        release.set()
+        thread.join()
+
+
+def test_the_driver_is_not_a_context_manager():
+    motor = QwiicScmd(i2c_driver=SimulatedI2C())
+    with pytest.raises((AttributeError, TypeError)):
+        with motor:
+            pass
@@ -0,0 +1,60 @@
+# The configuration shadow: read-modify-writes skip the read once a register
+# is known, refresh() reloads it and invalidate() forgets it.
+
+import pytest
+
+from Qwiic_SCMD_CP import QwiicScmd
+from Qwiic_SCMD_CP.simulated_i2c import SimulatedI2C
+
+INV = QwiicScmd.SCMD_INV_2_9
+
+
+@pytest.fixture
+def bus():
+    return SimulatedI2C()
+
+
+def _transactions(bus, action):
+    bus.reset_stats()
+    action()
+    return bus.stats()["transactions"]
+
+
+def test_known_register_is_not_read_again(bus):
+    motor = QwiicScmd(i2c_driver=bus)
+    assert _transactions(bus, lambda: motor.inversion_mode(2, 1)) == 2
+    assert _transactions(bus, lambda: motor.inversion_mode(3, 1)) == 1
+    assert bus.devices[0x5D].registers[INV] == 0b11
+
+
+def test_without_the_shadow_every_change_reads(bus):
+    motor = QwiicScmd(i2c_driver=bus, shadow_config=False)
+    motor.inversion_mode(2, 1)
+    assert _transactions(bus, lambda: motor.inversion_mode(3, 1)) == 2
+
+
+def test_refresh_picks_up_changes_behind_the_driver(bus):
+    motor = QwiicScmd(i2c_driver=bus)
+    motor.inversion_mode(2, 1)
+    bus.devices[0x5D].registers[INV] |= 0b100
+    motor.refresh()
+    assert _transactions(bus, lambda: motor.inversion_mode(5, 1)) == 1
+    assert bus.devices[0x5D].registers[INV] == 0b1101
+
+
+def test_invalidate_reads_the_register_again(bus):
+    motor = QwiicScmd(i2c_driver=bus)
+    motor.inversion_mode(2, 1)
+    bus.devices[0x5D].registers[INV] |= 0b100
+    motor.invalidate()
+    assert _transactions(bus, lambda: motor.inversion_mode(5, 1)) == 2
+    assert bus.devices[0x5D].registers[INV] == 0b1101
+
+
+def test_refresh_drops_the_suppression_record(bus):
+    motor = QwiicScmd(i2c_driver=bus, suppress_redundant_writes=True, refresh_interval=60)
+    motor.enable()
+    bus.devices[0x5D].registers[QwiicScmd.SCMD_DRIVER_ENABLE] = 0
+    motor.refresh()
+    assert _transactions(bus, lambda: motor.enable()) == 1
+    assert bus.devices[0x5D].registers[QwiicScmd.SCMD_DRIVER_ENABLE] == 1
@@ -0,0 +1,65 @@
+# Redundant-write suppression: unchanged drive writes are skipped until the
+# refresh interval runs out, and nothing is recorded that did not reach the bus.
+
+import time
+
+import pytest
+
+from Qwiic_SCMD_CP import QwiicScmd
+from Qwiic_SCMD_CP.simulated_i2c import SimulatedI2C
+
+
+@pytest.fixture
+def bus():
+    return SimulatedI2C()
+
+
+def _writes(bus, action):
+    bus.reset_stats()
+    action()
+    return bus.stats()["transactions"]
+
+
+def test_unchanged_drive_is_suppressed(bus):
+    motor = QwiicScmd(i2c_driver=bus, suppress_redundant_writes=True, refresh_interval=60)
+    assert _writes(bus, lambda: motor.set_drive(0, 1, 100)) == 1
+    assert _writes(bus, lambda: motor.set_drive(0, 1, 100)) == 0
+    assert _writes(bus, lambda: motor.set_drive(0, 1, 102)) == 1
+    assert motor.write_counts() == {"issued": 2, "suppressed": 1}
+
+
+def test_refresh_interval_rewrites_unchanged_drive(bus):
+    motor = QwiicScmd(i2c_driver=bus, suppress_redundant_writes=True, refresh_interval=0.01)
+    motor.set_drive(0, 1, 100)
+    assert _writes(bus, lambda: motor.set_drive(0, 1, 100)) == 0
+    time.sleep(0.02)
+    assert _writes(bus, lambda: motor.set_drive(0, 1, 100)) == 1
+
+
+def test_set_drives_writes_only_changed_motors(bus):
+    motor = QwiicScmd(i2c_driver=bus, suppress_redundant_writes=True, refresh_interval=60)
+    motor.set_drives({0: (1, 100), 1: (1, 100), 2: (1, 100)})
+    bus.reset_stats()
+    motor.set_drives({0: (1, 100), 1: (0, 50), 2: (1, 100)})
+    assert bus.stats()["transactions"] == 1
+    assert bus.stats()["bytes_written"] == 2
+
+
+def test_failed_write_is_not_recorded(bus):
+    motor = QwiicScmd(i2c_driver=bus, suppress_redundant_writes=True, refresh_interval=60)
+    bus.fail_next()
+    with pytest.raises(OSError):
+        motor.set_drive(0, 1, 100)
+    assert _writes(bus, lambda: motor.set_drive(0, 1, 100)) == 1
+    bus.fail_next()
+    with pytest.raises(OSError):
+        motor.set_drives({1: (1, 100), 2: (1, 100)})
+    assert _writes(bus, lambda: motor.set_drives({1: (1, 100), 2: (1, 100)})) == 1
+
+
+def test_bad_entry_leaves_earlier_motors_unrecorded(bus):
+    motor = QwiicScmd(i2c_driver=bus, suppress_redundant_writes=True, refresh_interval=60)
+    with pytest.raises(ValueError):
+        motor.set_drives({0: (1, 100), 1: (1, 300)})
+    assert _writes(bus, lambda: motor.set_drives({0: (1, 100)})) == 1
+    assert bus.devices[0x5D].registers[QwiicScmd.SCMD_MA_DRIVE] != 0x80
@@ -0,0 +1,75 @@
+# RetryingI2C: retries chosen by errno, cut short by the per-transaction
+# budget or by a deadline over a whole driver call. The bus model clock
+# stands in for time, so every attempt costs its modeled duration.
+
+import errno
+
+import pytest
+
+from Qwiic_SCMD_CP import QwiicScmd
+from Qwiic_SCMD_CP.simulated_i2c import SimulatedI2C
+from Qwiic_SCMD_CP.transport import RetryingI2C
+
+
+def _motor(overhead=0.002, budget=None):
+    bus = SimulatedI2C(transaction_overhead=overhead)
+    retrying = RetryingI2C(bus, budget=budget, clock=bus.now, sleep=bus.advance)
+    return bus, retrying, QwiicScmd(i2c_driver=retrying)
+
+
+def test_transient_error_is_retried():
+    bus, retrying, motor = _motor()
+    bus.fail_next(2)
+    motor.set_drive(0, 1, 100)
+    stats = retrying.stats()
+    assert (stats["retries"], stats["recovered"], stats["failures"]) == (2, 1, 0)
+    assert bus.devices[0x5D].registers[QwiicScmd.SCMD_MA_DRIVE] == 128 + 50
+
+
+def test_retries_run_out():
+    bus, retrying, motor = _motor()
+    bus.fail_next(4)
+    with pytest.raises(OSError):
+        motor.set_drive(0, 1, 100)
+    assert (retrying.stats()["retries"], retrying.stats()["failures"]) == (3, 1)
+
+
+def test_other_errors_are_raised_at_once():
+    bus, retrying, motor = _motor()
+    bus.fail_next(1, errno.EINVAL)
+    with pytest.raises(OSError):
+        motor.set_drive(0, 1, 100)
+    assert retrying.stats()["retries"] == 0
+    assert retrying.stats()["errors"] == {errno.EINVAL: 1}
+
+
+def test_budget_cuts_retries_short():
+    bus, retrying, motor = _motor(budget=0.005)
+    bus.fail_next(3)
+    with pytest.raises(OSError):
+        motor.set_drive(0, 1, 100)
+    stats = retrying.stats()
+    assert (stats["retries"], stats["budget_exhausted"]) == (1, 1)
+
+
+def test_deadline_covers_the_whole_call():
+    bus, retrying, motor = _motor()
+    with retrying.deadline(0.005):
+        # earlier transactions of the same call used most of it
+        bus.advance(0.004)
+        bus.fail_next(1)
+        with pytest.raises(OSError):
+            motor.set_drive(0, 1, 100)
+    assert retrying.stats()["budget_exhausted"] == 1
+    bus.fail_next(1)
+    motor.set_drive(0, 1, 100)
+    assert retrying.stats()["recovered"] == 1
+
+
+def test_nested_deadline_keeps_the_earlier_one():
+    bus, retrying, motor = _motor()
+    with retrying.deadline(0.001):
+        with retrying.deadline(1.0):
+            bus.fail_next(1)
+            with pytest.raises(OSError):
+                motor.set_drive(0, 1, 100)
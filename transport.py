@@ -0,0 +1,204 @@
+# Retrying I2C transport for QwiicScmd
+#
+# RetryingI2C wraps a busio.I2C (or compatible) bus and retries failed
+# transactions according to a policy chosen by the error's errno. Every
+# transaction has a time budget: a retry is only attempted if it can finish
+# within it, so a noisy bus costs a control loop at most the budget per
+# transaction instead of an unbounded stall. One driver call can issue
+# several transactions; deadline() bounds all of them together. Use it as
+#
+#   bus = RetryingI2C(busio.I2C(board.SCL, board.SDA))
+#   motor = QwiicScmd(i2c_driver=bus)
+#   with bus.deadline(0.005):
+#       motor.set_drives(drives)
+#
+# Retrying repeats the whole transaction. That is harmless for register
+# reads and for writes that set a register, but a write to a command
+# register (FSAFE_CTRL, REM_READ/REM_WRITE) whose data arrived before the
+# error will run twice.
+
+import errno
+import time
+
+from . import _thread_local
+from .bus_proxy import BusProxy
+
+_EREMOTEIO = getattr(errno, "EREMOTEIO", 121)
+
+
+class RetryPolicy:
+    """
+        How to retry one class of errors
+
+        :param retries: retries after the first attempt; 0 never retries
+        :param backoff: seconds to wait before the first retry
+        :param max_backoff: longest wait; the wait doubles per retry
+
+    """
+
+    def __init__(self, retries=3, backoff=0.0001, max_backoff=0.002):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+
+# transient errors are retried; anything else (bad arguments, a missing bus)
+# is raised at once
+DEFAULT_POLICIES = {
+    _EREMOTEIO: RetryPolicy(3),  # NAK: device busy or noise on the lines
+    errno.EIO: RetryPolicy(3),
+    errno.EAGAIN: RetryPolicy(3),
+    errno.ETIMEDOUT: RetryPolicy(1, backoff=0.001),  # clock stretching or a stuck bus
+}
+NO_RETRY = RetryPolicy(0)
+
+
+class RetryingI2C(BusProxy):
+    """
+        busio.I2C compatible bus that retries failed transactions
+
+        :param i2c: the bus to wrap
+        :param policies: dict of errno: RetryPolicy, default DEFAULT_POLICIES
+        :param default_policy: policy for errnos not in policies, default
+            no retries
+        :param budget: seconds one transaction may take in total, retries
+            and waits included; None for no limit. See deadline() for a
+            limit on a whole driver call
+        :param clock: time source in seconds
+        :param sleep: function that waits a number of seconds
+
+    """
+
+    def __init__(self, i2c, policies=None, default_policy=NO_RETRY, budget=0.005,
+                 clock=time.monotonic, sleep=time.sleep):
+        super().__init__(i2c)
+        self.policies = dict(DEFAULT_POLICIES if policies is None else policies)
+        self.default_policy = default_policy
+        self.budget = budget
+        self.clock = clock
+        self.sleep = sleep
+        # deadline() of the calling thread: clock() time, or None
+        self._deadline = _thread_local()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.calls = 0
+        self.retries = 0
+        self.recovered = 0
+        self.failures = 0
+        self.budget_exhausted = 0
+        self.errors = {}
+
+    def stats(self):
+        """
+            :return: calls, retries, recovered (calls that succeeded after a
+                retry), failures (calls that raised), budget_exhausted
+                (failures cut short by the budget or a deadline) and errors
+                (count per errno, every attempt)
+            :rtype: dict
+
+        """
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "recovered": self.recovered,
+            "failures": self.failures,
+            "budget_exhausted": self.budget_exhausted,
+            "errors": dict(self.errors),
+        }
+
+    # deadline( ... )
+    #
+    #     Limit on every retry made until the block ends, in this thread
+    #
+    #   seconds -- time from now
+    def deadline(self, seconds):
+        """
+            Bound the retries of all transactions in a with block, typically
+            one driver call, by a shared deadline
+
+            The first attempt of a transaction is always made; a retry only
+            if it can finish before the deadline (and within budget). Nested
+            deadlines keep the earlier one. The deadline belongs to the
+            thread that entered the block.
+
+            :param seconds: time from now
+
+            :return: context manager
+
+        """
+        return _Deadline(self, seconds)
+
+    def _call(self, method, *args, **kwargs):
+        self.calls += 1
+        start = self.clock()
+        deadline = getattr(self._deadline, "at", None)
+        attempt = 0
+        while True:
+            try:
+                result = method(*args, **kwargs)
+            except OSError as e:
+                self.errors[e.errno] = self.errors.get(e.errno, 0) + 1
+                policy = self.policies.get(e.errno, self.default_policy)
+                if attempt >= policy.retries:
+                    self.failures += 1
+                    raise
+                delay = min(policy.backoff * (1 << attempt), policy.max_backoff)
+                # only retry if the wait plus one more attempt (as long as the
+                # average so far) fits in the budget and before the deadline
+                now = self.clock()
+                finish = now + delay + (now - start) / (attempt + 1)
+                if ((self.budget is not None and finish - start > self.budget)
+                        or (deadline is not None and finish > deadline)):
+                    self.failures += 1
+                    self.budget_exhausted += 1
+                    raise
+                if delay:
+                    self.sleep(delay)
+                attempt += 1
+                self.retries += 1
+                continue
+            if attempt:
+                self.recovered += 1
+            return result
+
+    # busio.I2C transactions, retried; BusProxy forwards the rest
+
+    def writeto(self, address, buffer, *, start=0, end=None):
+        self._call(self.i2c.writeto, address, buffer, start=start, end=end)
+
+    def readfrom_into(self, address, buffer, *, start=0, end=None):
+        self._call(self.i2c.readfrom_into, address, buffer, start=start, end=end)
+
+    def writeto_then_readfrom(self, address, buffer_out, buffer_in, *, out_start=0,
+                              out_end=None, in_start=0, in_end=None):
+        self._call(self.i2c.writeto_then_readfrom, address, buffer_out, buffer_in,
+                   out_start=out_start, out_end=out_end, in_start=in_start, in_end=in_end)
+
+    def readfrom(self, address, nbytes):
+        return self._call(self.i2c.readfrom, address, nbytes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.deinit()
+
+
+class _Deadline:
+    # context manager returned by RetryingI2C.deadline()
+
+    def __init__(self, bus, seconds):
+        self._bus = bus
+        self._seconds = seconds
+        self._outer = None
+
+    def __enter__(self):
+        local = self._bus._deadline
+        self._outer = getattr(local, "at", None)
+        at = self._bus.clock() + self._seconds
+        local.at = at if self._outer is None else min(at, self._outer)
+        return self
+
+    def __exit__(self, *exc):
+        self._bus._deadline.at = self._outer